@@ -0,0 +1,212 @@
+import ctypes
+import json
+import os
+import queue
+import threading
+import time
+import pygame
+from OpenGL.GL import *
+from gl_resources import SCOPE_APP
+
+# Screenshots and gameplay recording without stalling the frame. Each
+# capture starts an asynchronous glReadPixels into one of a ring of pixel
+# pack buffers; the buffer is only mapped CAPTURE_RING - 1 frames later,
+# when the GPU has long finished with it. Mapped pixels are handed to a
+# worker thread that does all the encoding and disk IO.
+
+CAPTURE_RING = 3
+CAPTURE_QUEUE = 8 # video frames waiting on the worker before new ones are dropped
+CAPTURE_FPS = 30
+
+VIDEO = "video"
+SCREENSHOT = "screenshot"
+
+class CaptureWorker(threading.Thread):
+    # Consumes ("start", ...), ("frame", ...), ("shot", ...) and ("stop",)
+    # messages in order; None ends the thread
+    def __init__(self, size):
+        super().__init__(name="capture", daemon=True)
+        self.size = size
+        self.messages = queue.Queue()
+        self.written = 0
+        self.raw_file = None
+        self.session = None
+
+    def run(self):
+        while True:
+            message = self.messages.get()
+            if message is None: break
+            kind = message[0]
+            if kind == "start":
+                self._start(*message[1:])
+            elif kind == "frame":
+                self._frame(*message[1:])
+            elif kind == "shot":
+                self._save_png(message[2], message[1])
+            elif kind == "stop":
+                self._stop()
+        self._stop()
+
+    def _start(self, path, video_format, fps):
+        self.session = {"path": path, "format": video_format, "fps": fps, "size": self.size,
+                        "pixel_format": "rgb24", "bottom_up": True, "frames": 0, "times": []}
+        if video_format == "raw":
+            self.raw_file = open(path + ".rgb", "wb")
+        else:
+            os.makedirs(path, exist_ok=True)
+
+    def _frame(self, data, captured_at):
+        session = self.session
+        if session is None: return
+        if self.raw_file:
+            self.raw_file.write(data)
+        else:
+            self._save_png(data, os.path.join(session["path"], f"frame-{session['frames']:06d}.png"))
+        session["frames"] += 1
+        session["times"].append(round(captured_at, 4))
+        self.written += 1
+
+    def _stop(self):
+        session = self.session
+        if session is None: return
+        if self.raw_file:
+            self.raw_file.close()
+            self.raw_file = None
+        # Raw video has no header; the sidecar carries what a converter needs
+        with open(session["path"] + ".json", "w") as f:
+            json.dump(session, f)
+        self.session = None
+
+    def _save_png(self, data, path):
+        # GL rows start at the bottom of the window
+        surface = pygame.image.fromstring(data, self.size, "RGB", True)
+        pygame.image.save(surface, path)
+
+class FrameCapture:
+    def __init__(self, resources, size, out_dir="captures", video_format="png", fps=CAPTURE_FPS):
+        self.resources = resources
+        self.size = size
+        self.nbytes = size[0] * size[1] * 3
+        self.out_dir = out_dir
+        self.video_format = video_format
+        self.interval = 1.0 / fps
+        self.fps = fps
+        self.pbos = None # allocated on first use
+        self.pending = [None] * CAPTURE_RING # (frame, kind, captured_at, path) per slot
+        self.slot = 0
+        self.frame = 0
+        self.recording = False
+        self.next_capture = 0.0
+        self.screenshot_path = None
+        self.session_path = None
+        self.captured = 0
+        self.dropped = 0
+        self.render_time = 0.0
+        self.worker = CaptureWorker(size)
+        self.worker.start()
+
+    def _stamp(self):
+        return time.strftime("%Y%m%d-%H%M%S")
+
+    def screenshot(self):
+        os.makedirs(self.out_dir, exist_ok=True)
+        self.screenshot_path = os.path.join(self.out_dir, f"screenshot-{self._stamp()}.png")
+
+    def toggle_recording(self):
+        if self.recording:
+            self.stop_recording()
+        else:
+            self.start_recording()
+
+    def start_recording(self):
+        if self.recording: return
+        os.makedirs(self.out_dir, exist_ok=True)
+        path = os.path.join(self.out_dir, f"capture-{self._stamp()}")
+        self.worker.messages.put(("start", path, self.video_format, self.fps))
+        self.recording = True
+        self.next_capture = 0.0
+        self.session_path = path
+        print(f"Recording to {path}")
+
+    def stop_recording(self):
+        if not self.recording: return
+        self._collect(all_slots=True)
+        self.worker.messages.put(("stop",))
+        self.recording = False
+        print(f"Recording stopped; {self.session_path}.json describes the frames")
+
+    def capture(self, now):
+        # Call once per frame, after the last draw and before the flip
+        if self.pbos is None and not (self.recording or self.screenshot_path): return
+        began = time.perf_counter()
+        self.frame += 1
+        self._collect()
+
+        kind = None
+        if self.screenshot_path:
+            kind = SCREENSHOT
+        elif self.recording and now >= self.next_capture:
+            kind = VIDEO
+            # Stay on the capture grid, but never try to catch up on missed frames
+            self.next_capture = max(self.next_capture + self.interval, now)
+        if kind:
+            self._read_async(kind, now)
+        self.render_time += time.perf_counter() - began
+
+    def _read_async(self, kind, now):
+        if self.pbos is None:
+            self.pbos = []
+            for _ in range(CAPTURE_RING):
+                pbo = self.resources.buffer(SCOPE_APP, self.nbytes)
+                glBindBuffer(GL_PIXEL_PACK_BUFFER, pbo)
+                glBufferData(GL_PIXEL_PACK_BUFFER, self.nbytes, None, GL_STREAM_READ)
+                self.pbos.append(pbo)
+        if self.pending[self.slot] is not None:
+            self._collect_slot(self.slot)
+
+        glPixelStorei(GL_PACK_ALIGNMENT, 1)
+        glReadBuffer(GL_BACK)
+        glBindBuffer(GL_PIXEL_PACK_BUFFER, self.pbos[self.slot])
+        glReadPixels(0, 0, self.size[0], self.size[1], GL_RGB, GL_UNSIGNED_BYTE, ctypes.c_void_p(0))
+        glBindBuffer(GL_PIXEL_PACK_BUFFER, 0)
+        self.pending[self.slot] = (self.frame, kind, now, self.screenshot_path if kind == SCREENSHOT else None)
+        if kind == SCREENSHOT:
+            self.screenshot_path = None
+        self.slot = (self.slot + 1) % CAPTURE_RING
+
+    def _collect(self, all_slots=False):
+        for slot, entry in enumerate(self.pending):
+            if entry is None: continue
+            if all_slots or self.frame - entry[0] >= CAPTURE_RING - 1:
+                self._collect_slot(slot)
+
+    def _collect_slot(self, slot):
+        _, kind, captured_at, path = self.pending[slot]
+        self.pending[slot] = None
+        if kind == VIDEO and self.worker.messages.qsize() >= CAPTURE_QUEUE:
+            # The encoder is behind; skip the copy rather than queue without bound
+            self.dropped += 1
+            return
+        glBindBuffer(GL_PIXEL_PACK_BUFFER, self.pbos[slot])
+        ptr = glMapBuffer(GL_PIXEL_PACK_BUFFER, GL_READ_ONLY)
+        data = ctypes.string_at(ptr, self.nbytes) if ptr else None
+        glUnmapBuffer(GL_PIXEL_PACK_BUFFER)
+        glBindBuffer(GL_PIXEL_PACK_BUFFER, 0)
+        if data is None: return
+        if kind == SCREENSHOT:
+            self.worker.messages.put(("shot", path, data))
+            print(f"Screenshot saved to {path}")
+        else:
+            self.worker.messages.put(("frame", data, captured_at))
+            self.captured += 1
+
+    def close(self):
+        # Flushes everything in flight; call while the GL context is still alive
+        if self.pbos is not None:
+            self._collect(all_slots=True)
+        self.stop_recording()
+        self.worker.messages.put(None)
+        self.worker.join()
+        if self.captured:
+            print(f"Capture: {self.worker.written} frames written, {self.dropped} dropped, "
+                  f"{self.render_time * 1000 / self.frame:.2f}ms per frame on the render thread")
@@ -0,0 +1,197 @@
+import argparse
+import itertools
+import json
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from entities import KIND_EYE, KIND_TRAP, KIND_POWERUP, KIND_PYRAMID
+from simulation import MAZE_WIDTH, MAZE_HEIGHT, MOVE_SPEED
+from maze import generate_maze, populate_entities, EYE_DENSITY, TRAP_DENSITY, POWERUP_DENSITY, PYRAMID_DENSITY
+from maze_grid import DIRECTIONS, WALL, EXIT, maze_to_array, entity_grids, distance_field
+
+# Headless Monte Carlo runs of bot agents through generated mazes, used to
+# tune the place_random_* densities from data instead of playtesting.
+#
+# Agents move one grid cell per step. Step cost and pickup effects mirror
+# the game loop: 60 frames per second at MOVE_SPEED units per frame, traps
+# slow to 30%, a powerup doubles speed for 2s, a pyramid freezes the player
+# for the 4s launch, and an eye teleports to a random spawn and then cannot
+# fire again for the 3s blindness.
+
+POLICIES = ("random", "wall", "shortest")
+FRAME_RATE = 60
+CELL_SECONDS = 2 / (MOVE_SPEED * FRAME_RATE)
+TRAP_FACTOR = 0.3
+BOOST_FACTOR = 2.0
+BOOST_SECONDS = 2.0
+LAUNCH_SECONDS = 4.0
+BLIND_SECONDS = 3.0
+PERCENTILES = (10, 25, 50, 75, 90)
+
+def build_batch(count, width, height, densities):
+    walls, eyes, traps, powerups, pyramids = [], [], [], [], []
+    for _ in range(count):
+        maze = generate_maze(width, height)
+        grid = maze_to_array(maze)
+        ents = entity_grids(populate_entities(maze, *densities), grid.shape)
+        walls.append(grid)
+        eyes.append(ents[KIND_EYE])
+        traps.append(ents[KIND_TRAP])
+        powerups.append(ents[KIND_POWERUP])
+        pyramids.append(ents[KIND_PYRAMID])
+    return np.stack(walls), np.stack(eyes), np.stack(traps), np.stack(powerups), np.stack(pyramids)
+
+def spawn_table(open_mask):
+    # Padded flat indices of the cells get_random_spawn can return, per maze
+    b, h, w = open_mask.shape
+    rows, cols = np.indices((h, w))
+    allowed = open_mask & ~((rows < 4) & (cols < 4))
+    counts = allowed.reshape(b, -1).sum(axis=1)
+    table = np.zeros((b, counts.max()), dtype=np.int64)
+    for i in range(b):
+        cells = np.flatnonzero(allowed[i])
+        table[i, :len(cells)] = cells
+    return table, counts
+
+def simulate(grid, eyes, traps, powerups, pyramids, agents, max_steps, rng):
+    b, h, w = grid.shape
+    open_mask = grid != WALL
+    dist = distance_field(open_mask, grid == EXIT)
+    dist = np.where(dist < 0, np.iinfo(np.int32).max, dist)
+    spawns, spawn_counts = spawn_table(open_mask)
+
+    # One row per agent: agents of every policy in every maze, all at once
+    n = b * len(POLICIES) * agents
+    maze_of = np.repeat(np.arange(b), len(POLICIES) * agents)
+    policy = np.tile(np.repeat(np.arange(len(POLICIES)), agents), b)
+    r = np.ones(n, dtype=np.int64)
+    c = np.ones(n, dtype=np.int64)
+    heading = np.ones(n, dtype=np.int64) # start facing east like the player
+    t = np.zeros(n)
+    boost_until = np.zeros(n)
+    blind_until = np.zeros(n)
+    finish = np.full(n, np.nan)
+    active = np.ones(n, dtype=np.bool_)
+    taken = np.zeros((n, h, w), dtype=np.bool_)
+    dr, dc = DIRECTIONS[:, 0], DIRECTIONS[:, 1]
+
+    for _ in range(max_steps):
+        idx = np.flatnonzero(active)
+        if not len(idx): break
+        m, rr, cc, hd, pol = maze_of[idx], r[idx], c[idx], heading[idx], policy[idx]
+        nr = rr[:, None] + dr
+        nc = cc[:, None] + dc
+        nb_open = open_mask[m[:, None], nr, nc]
+
+        choice = np.argmax(rng.random((len(idx), 4)) * nb_open, axis=1)
+
+        # Right-hand rule: right, straight, left, back
+        order = (hd[:, None] + np.array((1, 0, 3, 2))) % 4
+        follow = order[np.arange(len(idx)), np.argmax(np.take_along_axis(nb_open, order, axis=1), axis=1)]
+        choice = np.where(pol == 1, follow, choice)
+
+        nb_dist = np.where(nb_open, dist[m[:, None], nr, nc], np.iinfo(np.int32).max)
+        choice = np.where(pol == 2, np.argmin(nb_dist, axis=1), choice)
+
+        now = t[idx]
+        speed = np.where(now < boost_until[idx], BOOST_FACTOR,
+                         np.where(traps[m, rr, cc], TRAP_FACTOR, 1.0))
+        now = now + CELL_SECONDS / speed
+        rr = rr + dr[choice]
+        cc = cc + dc[choice]
+
+        got_boost = powerups[m, rr, cc] & ~taken[idx, rr, cc]
+        boost_until[idx[got_boost]] = now[got_boost] + BOOST_SECONDS
+        got_launch = pyramids[m, rr, cc] & ~taken[idx, rr, cc]
+        now = now + got_launch * LAUNCH_SECONDS
+        taken[idx, rr, cc] |= got_boost | got_launch
+
+        done = grid[m, rr, cc] == EXIT
+        finish[idx[done]] = now[done]
+        active[idx[done]] = False
+
+        hit = eyes[m, rr, cc] & (now >= blind_until[idx]) & ~done
+        if hit.any():
+            hm = m[hit]
+            pick = (rng.random(len(hm)) * spawn_counts[hm]).astype(np.int64)
+            rr[hit], cc[hit] = np.divmod(spawns[hm, pick], w)
+            blind_until[idx[hit]] = now[hit] + BLIND_SECONDS
+
+        r[idx], c[idx], heading[idx], t[idx] = rr, cc, choice, now
+
+    return {name: finish[policy == i] for i, name in enumerate(POLICIES)}
+
+def run_task(task):
+    densities, seed, count, width, height, agents, max_steps = task
+    random.seed(seed)
+    rng = np.random.default_rng(seed)
+    batch = build_batch(count, width, height, densities)
+    return densities, simulate(*batch, agents, max_steps, rng)
+
+def summarize(times):
+    finished = times[~np.isnan(times)]
+    row = {"runs": int(len(times)), "completed": float(len(finished) / len(times)) if len(times) else 0.0}
+    if len(finished):
+        row["mean"] = float(finished.mean())
+        for p, v in zip(PERCENTILES, np.percentile(finished, PERCENTILES)):
+            row[f"p{p}"] = float(v)
+    return row
+
+def main():
+    parser = argparse.ArgumentParser(description="Monte Carlo maze difficulty simulator")
+    parser.add_argument("--width", type=int, default=MAZE_WIDTH)
+    parser.add_argument("--height", type=int, default=MAZE_HEIGHT)
+    parser.add_argument("--mazes", type=int, default=256, help="mazes per density setting")
+    parser.add_argument("--batch", type=int, default=32, help="mazes simulated together per task")
+    parser.add_argument("--agents", type=int, default=4, help="agents per policy per maze")
+    parser.add_argument("--max-steps", type=int, default=20000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--eye-density", type=float, nargs="+", default=[EYE_DENSITY])
+    parser.add_argument("--trap-density", type=float, nargs="+", default=[TRAP_DENSITY])
+    parser.add_argument("--powerup-density", type=float, nargs="+", default=[POWERUP_DENSITY])
+    parser.add_argument("--pyramid-density", type=float, nargs="+", default=[PYRAMID_DENSITY])
+    parser.add_argument("--json", help="write the summary table to this file")
+    args = parser.parse_args()
+
+    settings = list(itertools.product(args.eye_density, args.trap_density, args.powerup_density, args.pyramid_density))
+    tasks = []
+    seed = args.seed
+    for densities in settings:
+        for start in range(0, args.mazes, args.batch):
+            tasks.append((densities, seed, min(args.batch, args.mazes - start),
+                          args.width, args.height, args.agents, args.max_steps))
+            seed += 1
+
+    began = time.time()
+    results = {densities: {name: [] for name in POLICIES} for densities in settings}
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        for densities, times in pool.map(run_task, tasks):
+            for name, values in times.items():
+                results[densities][name].append(values)
+    elapsed = time.time() - began
+
+    table = []
+    header = f"{'eye':>5} {'trap':>5} {'pwr':>5} {'pyr':>5}  {'policy':<8} {'done':>6} {'mean':>7}" + "".join(f" {'p%d' % p:>7}" for p in PERCENTILES)
+    print(header)
+    for densities in settings:
+        for name in POLICIES:
+            row = summarize(np.concatenate(results[densities][name]))
+            table.append({"eye_density": densities[0], "trap_density": densities[1],
+                          "powerup_density": densities[2], "pyramid_density": densities[3],
+                          "policy": name, **row})
+            stats = "".join(f" {row.get(key, float('nan')):7.1f}" for key in ["mean"] + [f"p{p}" for p in PERCENTILES])
+            print(f"{densities[0]:5.2f} {densities[1]:5.2f} {densities[2]:5.2f} {densities[3]:5.2f}  {name:<8} {row['completed']:6.1%}{stats}")
+
+    runs = sum(row["runs"] for row in table)
+    print(f"{runs} runs over {len(settings) * args.mazes} mazes in {elapsed:.1f}s with {args.workers} workers")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(table, f, indent=2)
+
+if __name__ == "__main__":
+    main()
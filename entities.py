@@ -0,0 +1,121 @@
+import numpy as np
+
+KIND_EYE = 0
+KIND_TRAP = 1
+KIND_POWERUP = 2
+KIND_PYRAMID = 3
+
+# Struct-of-arrays store for every static pickup/hazard in a level.
+# Positions are world coordinates (c * 2, r * 2). Removal only clears the
+# alive flag; dead slots are compacted away the next time entities are added.
+# `version` changes on every mutation so readers can tell when to re-copy.
+class EntityStore:
+    def __init__(self, capacity=64):
+        self.x = np.zeros(capacity, dtype=np.float32)
+        self.z = np.zeros(capacity, dtype=np.float32)
+        self.kind = np.zeros(capacity, dtype=np.uint8)
+        self.alive = np.zeros(capacity, dtype=np.bool_)
+        self.count = 0
+        self.dead = 0
+        self.version = 0
+
+    def _reserve(self, n):
+        if self.dead and self.dead * 2 >= self.count:
+            self.compact()
+        needed = self.count + n
+        capacity = len(self.x)
+        if needed <= capacity: return
+        while capacity < needed:
+            capacity *= 2
+        for name in ("x", "z", "kind", "alive"):
+            old = getattr(self, name)
+            grown = np.zeros(capacity, dtype=old.dtype)
+            grown[:self.count] = old[:self.count]
+            setattr(self, name, grown)
+
+    def add(self, kind, x, z):
+        self._reserve(1)
+        i = self.count
+        self.x[i] = x
+        self.z[i] = z
+        self.kind[i] = kind
+        self.alive[i] = True
+        self.count += 1
+        self.version += 1
+        return i
+
+    def extend(self, kind, points):
+        points = np.asarray(points, dtype=np.float32).reshape(-1, 2)
+        n = len(points)
+        self._reserve(n)
+        s = slice(self.count, self.count + n)
+        self.x[s] = points[:, 0]
+        self.z[s] = points[:, 1]
+        self.kind[s] = kind
+        self.alive[s] = True
+        self.count += n
+        self.version += 1
+
+    def remove(self, i):
+        if self.alive[i]:
+            self.alive[i] = False
+            self.dead += 1
+            self.version += 1
+
+    def compact(self):
+        keep = np.flatnonzero(self.alive[:self.count])
+        n = len(keep)
+        for name in ("x", "z", "kind", "alive"):
+            arr = getattr(self, name)
+            arr[:n] = arr[keep]
+        self.alive[n:self.count] = False
+        self.count = n
+        self.dead = 0
+        self.version += 1
+
+    def clear(self):
+        self.alive[:self.count] = False
+        self.count = 0
+        self.dead = 0
+        self.version += 1
+
+    def copy(self):
+        # Sized to the used slots; hands a stable view to other threads
+        other = EntityStore(max(self.count, 1))
+        n = self.count
+        other.x[:n] = self.x[:n]
+        other.z[:n] = self.z[:n]
+        other.kind[:n] = self.kind[:n]
+        other.alive[:n] = self.alive[:n]
+        other.count = n
+        other.dead = self.dead
+        other.version = self.version
+        return other
+
+    def _mask(self, kind):
+        n = self.count
+        return self.alive[:n] & (self.kind[:n] == kind)
+
+    def indices(self, kind):
+        return np.flatnonzero(self._mask(kind))
+
+    def positions(self, kind):
+        mask = self._mask(kind)
+        n = self.count
+        return np.column_stack((self.x[:n][mask], self.z[:n][mask]))
+
+    def within(self, kind, px, pz, radius):
+        n = self.count
+        d2 = (self.x[:n] - px) ** 2 + (self.z[:n] - pz) ** 2
+        return np.flatnonzero(self._mask(kind) & (d2 < radius * radius))
+
+    def at_cell(self, kind, r, c):
+        n = self.count
+        return bool(np.any(self._mask(kind) & (self.x[:n] == c * 2) & (self.z[:n] == r * 2)))
+
+    def __len__(self):
+        return self.count - self.dead
+
+    @property
+    def nbytes(self):
+        return self.x.nbytes + self.z.nbytes + self.kind.nbytes + self.alive.nbytes
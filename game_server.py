@@ -0,0 +1,384 @@
+import argparse
+import asyncio
+import json
+import random
+import time
+from collections import deque
+import numpy as np
+from simulation import (GameState, build_level, Inputs, NO_INPUT, TICK, TICK_RATE, MAX_CATCH_UP,
+                        MAZE_WIDTH, MAZE_HEIGHT, RESET, NEW_MAZE, TOGGLE_SLOW_WALK)
+
+# Headless server hosting many isolated GameStates in one process. Clients
+# talk newline-delimited JSON over TCP:
+#
+#   -> {"op": "join", "width": 12, "height": 12, "timing": false}
+#   -> {"op": "input", "f": 1, "b": 0, "l": 0, "r": 0}   held keys
+#   -> {"op": "cmd", "name": "reset" | "new_maze" | "toggle_slow_walk"}
+#   <- {"op": "level", "id": 1, "level": 1, "maze": [...], "ents": [[i, kind, x, z], ...]}
+#   <- {"op": "d", "t": tick, ...only the fields that changed, "rm": [i, ...]}
+#
+# A "level" message is sent on join and on every maze swap. Deltas are
+# taken against what the client was last sent, so a tick skipped for a
+# slow client is folded into the next one rather than queued.
+
+COMMANDS = (RESET, NEW_MAZE, TOGGLE_SLOW_WALK)
+SEND_BUFFER_LIMIT = 64 * 1024 # skip a client's deltas while its socket is this backed up
+# Maze sizes a client may ask for. Below 3x3 get_random_spawn has no cell
+# to pick; 32x32 generates in a few ms and its level line stays far below
+# asyncio's default 64 KB readline limit.
+MIN_MAZE_SIZE = 3
+MAX_MAZE_SIZE = 32
+MAX_QUEUED_COMMANDS = 8 # per session; commands past this are dropped
+TIMING_WINDOW = 60 * TICK_RATE # most recent tick durations kept for percentiles
+
+# Snapshot field -> (delta key, decimals or None)
+DELTA_FIELDS = (
+    ("player_x", "x", 3), ("player_z", "z", 3), ("player_yaw", "yaw", 2), ("cam_y", "cy", 2),
+    ("elapsed", "el", None), ("game_over", "go", None), ("final_time", "ft", None),
+    ("blindness_active", "bl", None), ("launch_active", "la", None), ("slow_walk_active", "sw", None),
+)
+
+def encode(message):
+    return (json.dumps(message, separators=(",", ":")) + "\n").encode()
+
+class Session:
+    def __init__(self, sid, writer, state, timing):
+        self.id = sid
+        self.writer = writer
+        self.timing = timing
+        self.state = state
+        self.inputs = NO_INPUT
+        self.commands = deque()
+        self.building = None # future for the next maze, built off the loop
+        self.sent = {}
+        self.sent_level = None
+        self.sent_alive = None
+        self.sent_version = None
+
+    def queue_command(self, name):
+        # Back-to-back repeats collapse into one, and only one new maze is
+        # ever being built; a maze asked for meanwhile is dropped
+        if len(self.commands) >= MAX_QUEUED_COMMANDS: return
+        if self.commands and self.commands[-1] == name: return
+        if name == NEW_MAZE:
+            if self.building is not None: return
+            state = self.state
+            self.building = asyncio.get_running_loop().run_in_executor(None, build_level, state.width, state.height)
+        self.commands.append(name)
+
+    def apply_commands(self):
+        # In order; a maze still being built holds back what came after it
+        while self.commands:
+            name = self.commands[0]
+            if name == NEW_MAZE:
+                if not self.building.done(): return
+                self.state.load_level(self.building.result())
+                self.building = None
+            else:
+                self.state.apply(name)
+            self.commands.popleft()
+
+    def level_message(self):
+        store = self.state.entities
+        n = store.count
+        live = np.flatnonzero(store.alive[:n])
+        ents = [[int(i), int(store.kind[i]), float(store.x[i]), float(store.z[i])] for i in live]
+        self.sent = {}
+        self.sent_level = self.state.level
+        self.sent_alive = store.alive[:n].copy()
+        self.sent_version = store.version
+        return {"op": "level", "id": self.id, "level": self.state.level, "maze": self.state.maze_map, "ents": ents}
+
+    def delta(self, now):
+        # Returns the encoded update owed to this client, or None
+        state = self.state
+        out = b""
+        if state.level != self.sent_level:
+            out = encode(self.level_message())
+        message = {}
+        for field, key, decimals in DELTA_FIELDS:
+            value = getattr(state, field)
+            if decimals is not None:
+                value = round(value, decimals)
+            if self.sent.get(key) != value:
+                message[key] = value
+                self.sent[key] = value
+        store = state.entities
+        if store.version != self.sent_version:
+            alive = store.alive[:store.count]
+            removed = np.flatnonzero(self.sent_alive & ~alive)
+            if len(removed):
+                message["rm"] = removed.tolist()
+            self.sent_alive = alive.copy()
+            self.sent_version = store.version
+        if message:
+            message["op"] = "d"
+            message["t"] = state.tick
+            if self.timing:
+                message["ts"] = now
+            out += encode(message)
+        return out or None
+
+class TickStats:
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.durations = deque(maxlen=TIMING_WINDOW)
+        self.ticks = 0
+        self.busy = 0.0
+        self.session_ticks = 0
+        self.late = 0
+        self.dropped = 0
+        self.bytes = 0
+        self.skipped = 0
+        self.peak = 0
+        self.began = time.perf_counter()
+
+    def add(self, duration):
+        self.durations.append(duration)
+        self.ticks += 1
+        self.busy += duration
+
+    def report(self):
+        elapsed = time.perf_counter() - self.began
+        if not self.ticks or not elapsed: return None
+        durations = np.array(self.durations) * 1000
+        per_session = self.busy / max(self.session_ticks, 1)
+        row = {
+            "sessions": self.peak,
+            "ticks": self.ticks,
+            "tick_ms_mean": self.busy * 1000 / self.ticks,
+            "tick_ms_p50": float(np.percentile(durations, 50)),
+            "tick_ms_p99": float(np.percentile(durations, 99)),
+            "tick_ms_max": float(durations.max()),
+            "late_ticks": self.late,
+            "dropped_ticks": self.dropped,
+            "session_ticks_per_s": self.session_ticks / elapsed,
+            "us_per_session_tick": per_session * 1e6,
+            # One event loop is one core; this many sessions would fill a tick
+            "sessions_per_core": TICK / per_session if per_session else float("inf"),
+            "kb_sent_per_s": self.bytes / 1024 / elapsed,
+            "skipped_sends": self.skipped,
+        }
+        self.reset()
+        return row
+
+def print_report(row):
+    print(f"{row['sessions']} sessions: tick {row['tick_ms_mean']:.2f}ms mean, {row['tick_ms_p99']:.2f}ms p99, "
+          f"{row['tick_ms_max']:.2f}ms max, {row['late_ticks']} late, {row['dropped_ticks']} dropped; "
+          f"{row['us_per_session_tick']:.1f}us per session tick, ~{row['sessions_per_core']:.0f} sessions/core at {TICK_RATE}Hz; "
+          f"{row['kb_sent_per_s']:.1f} KB/s out, {row['skipped_sends']} sends skipped")
+
+class GameServer:
+    def __init__(self, send_every=1):
+        self.send_every = send_every
+        self.sessions = {}
+        self.next_id = 1
+        self.stats = TickStats()
+        self.reports = []
+        self.server = None
+
+    async def start(self, host, port):
+        self.server = await asyncio.start_server(self.handle, host, port)
+        return self.server.sockets[0].getsockname()[1]
+
+    async def handle(self, reader, writer):
+        session = None
+        try:
+            while True:
+                line = await reader.readline()
+                if not line: break
+                try:
+                    message = json.loads(line)
+                    op = message["op"]
+                except (ValueError, KeyError, TypeError):
+                    writer.write(encode({"op": "error", "msg": "expected a JSON object with an op"}))
+                    continue
+                if op == "join" and session is None:
+                    try:
+                        width = int(message.get("width", MAZE_WIDTH))
+                        height = int(message.get("height", MAZE_HEIGHT))
+                    except (ValueError, TypeError, OverflowError):
+                        width = height = None
+                    if width is None or not (MIN_MAZE_SIZE <= width <= MAX_MAZE_SIZE and MIN_MAZE_SIZE <= height <= MAX_MAZE_SIZE):
+                        writer.write(encode({"op": "error", "msg": f"width and height must be integers {MIN_MAZE_SIZE}..{MAX_MAZE_SIZE}"}))
+                        continue
+                    # Maze generation stays off the loop so joins never stall a tick
+                    state = await asyncio.get_running_loop().run_in_executor(None, GameState, width, height)
+                    session = Session(self.next_id, writer, state, bool(message.get("timing", False)))
+                    self.next_id += 1
+                    self.sessions[session.id] = session
+                    writer.write(encode(session.level_message()))
+                elif session is None:
+                    writer.write(encode({"op": "error", "msg": "join first"}))
+                elif op == "input":
+                    session.inputs = Inputs(bool(message.get("f")), bool(message.get("b")),
+                                            bool(message.get("l")), bool(message.get("r")))
+                elif op == "cmd" and message.get("name") in COMMANDS:
+                    session.queue_command(message["name"])
+                else:
+                    writer.write(encode({"op": "error", "msg": f"unknown op {op!r}"}))
+        except ConnectionError:
+            pass
+        finally:
+            if session is not None:
+                self.sessions.pop(session.id, None)
+            writer.close()
+
+    def tick(self, now, send):
+        # One batched step of every session, with their updates written out
+        # in the same pass
+        stats = self.stats
+        for session in list(self.sessions.values()):
+            state = session.state
+            session.apply_commands()
+            state.step(session.inputs)
+            if not send: continue
+            if session.writer.transport.get_write_buffer_size() > SEND_BUFFER_LIMIT:
+                stats.skipped += 1
+                continue
+            out = session.delta(now)
+            if out:
+                session.writer.write(out)
+                stats.bytes += len(out)
+        stats.session_ticks += len(self.sessions)
+        stats.peak = max(stats.peak, len(self.sessions))
+
+    async def run(self, report_every=5.0, stop=None):
+        next_tick = time.perf_counter()
+        next_report = next_tick + report_every
+        ticks = 0
+        while stop is None or not stop.is_set():
+            now = time.perf_counter()
+            if now < next_tick:
+                await asyncio.sleep(next_tick - now)
+                continue
+            behind = now - next_tick
+            if behind > TICK:
+                self.stats.late += 1
+            if behind > MAX_CATCH_UP * TICK:
+                # Too far behind to catch up; those ticks are skipped outright
+                self.stats.dropped += int(behind / TICK)
+                next_tick = now
+            began = time.perf_counter()
+            ticks += 1
+            self.tick(now, ticks % self.send_every == 0)
+            self.stats.add(time.perf_counter() - began)
+            next_tick += TICK
+            if now >= next_report:
+                # Counters restart every interval even when reports are off
+                row = self.stats.report()
+                if row and report_every:
+                    self.reports.append(row)
+                    print_report(row)
+                next_report = now + (report_every or 5.0)
+            # Let socket reads and writes run between ticks
+            await asyncio.sleep(0)
+
+    async def close(self):
+        self.server.close()
+        for session in list(self.sessions.values()):
+            session.writer.close()
+        await self.server.wait_closed()
+
+class ClientStats:
+    def __init__(self):
+        self.messages = 0
+        self.bytes = 0
+        self.levels = 0
+        self.delays = []
+
+async def bot_client(host, port, seconds, stats, rng):
+    # Stand-in for a real client: wanders with random held keys and
+    # occasionally asks for a new maze
+    reader, writer = await asyncio.open_connection(host, port)
+    writer.write(encode({"op": "join", "timing": True}))
+    end = time.perf_counter() + seconds
+    next_input = 0.0
+
+    async def receive():
+        while True:
+            line = await reader.readline()
+            if not line: return
+            now = time.perf_counter()
+            stats.messages += 1
+            stats.bytes += len(line)
+            message = json.loads(line)
+            if message["op"] == "level":
+                stats.levels += 1
+            elif "ts" in message:
+                stats.delays.append(now - message["ts"])
+
+    receiving = asyncio.ensure_future(receive())
+    while time.perf_counter() < end and not receiving.done():
+        now = time.perf_counter()
+        if now >= next_input:
+            turn = rng.random()
+            writer.write(encode({"op": "input", "f": int(rng.random() < 0.8), "b": 0,
+                                 "l": int(turn < 0.2), "r": int(turn > 0.8)}))
+            if rng.random() < 0.01:
+                writer.write(encode({"op": "cmd", "name": NEW_MAZE}))
+            next_input = now + rng.uniform(0.1, 0.5)
+        await asyncio.sleep(0.05)
+    receiving.cancel()
+    writer.close()
+
+async def bench(args):
+    server = GameServer(args.send_every)
+    port = await server.start(args.host, args.port)
+    stop = asyncio.Event()
+    ticking = asyncio.ensure_future(server.run(args.report, stop))
+
+    stats = ClientStats()
+    rng = random.Random(args.seed)
+    clients = []
+    for i in range(args.clients):
+        clients.append(asyncio.ensure_future(bot_client(args.host, port, args.seconds, stats, random.Random(rng.random()))))
+        if i % 50 == 49:
+            await asyncio.sleep(0) # let the accepts keep up
+    await asyncio.gather(*clients)
+    stop.set()
+    await ticking
+    row = server.stats.report()
+    if row:
+        server.reports.append(row)
+        print_report(row)
+    await server.close()
+
+    delays = np.array(stats.delays) * 1000
+    print(f"clients: {stats.messages} messages, {stats.bytes / 1024:.1f} KB, {stats.levels} level loads")
+    if len(delays):
+        print(f"  tick to client {delays.mean():.2f}ms mean, {np.percentile(delays, 99):.2f}ms p99")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"server": server.reports, "client_delay_ms": {
+                "mean": float(delays.mean()) if len(delays) else None,
+                "p99": float(np.percentile(delays, 99)) if len(delays) else None}}, f, indent=2)
+
+async def serve(args):
+    server = GameServer(args.send_every)
+    port = await server.start(args.host, args.port)
+    print(f"Serving on {args.host}:{port}")
+    await server.run(args.report)
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless multi-session maze server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=7777, help="0 picks a free port")
+    parser.add_argument("--send-every", type=int, default=1, help="ticks between state deltas")
+    parser.add_argument("--report", type=float, default=5.0, help="seconds between tick reports, 0 for none")
+    parser.add_argument("--clients", type=int, default=0,
+                        help="run this many local stand-in clients against the server, then exit")
+    parser.add_argument("--seconds", type=float, default=10.0, help="length of a --clients run")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="write the --clients run's reports to this file")
+    args = parser.parse_args()
+
+    try:
+        asyncio.run(bench(args) if args.clients else serve(args))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
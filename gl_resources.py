@@ -0,0 +1,119 @@
+from OpenGL.GL import *
+from OpenGL.GLU import *
+import traceback
+
+TEXTURE = "texture"
+DISPLAY_LIST = "display_list"
+QUADRIC = "quadric"
+BUFFER = "buffer"
+
+# Scopes decide when a resource is released in bulk
+SCOPE_APP = "app" # lives until shutdown
+SCOPE_LEVEL = "level" # freed on every maze swap
+SCOPE_FRAME = "frame" # must be freed before the frame ends
+
+QUADRIC_BYTES = 64 # GLU keeps a tiny struct per quadric
+
+def _key(kind, handle):
+    # Quadrics are ctypes pointers, everything else is a GL name
+    return (kind, id(handle) if kind == QUADRIC else int(handle))
+
+class _Record:
+    __slots__ = ("kind", "handle", "scope", "nbytes", "origin")
+
+    def __init__(self, kind, handle, scope, nbytes, origin):
+        self.kind = kind
+        self.handle = handle
+        self.scope = scope
+        self.nbytes = nbytes
+        self.origin = origin
+
+# Owns every GL object the game creates so that nothing outlives its level
+# or the session. In debug mode each allocation remembers where it was made
+# so leaks can be reported with a call site.
+class GLResources:
+    def __init__(self, debug=False):
+        self.debug = debug
+        self.live = {}
+        self.allocated = 0
+        self.freed = 0
+
+    def _track(self, kind, handle, scope, nbytes):
+        origin = "".join(traceback.format_stack(limit=4)[:-2]) if self.debug else None
+        self.live[_key(kind, handle)] = _Record(kind, handle, scope, nbytes, origin)
+        self.allocated += 1
+        return handle
+
+    def texture(self, scope, width=0, height=0, bytes_per_pixel=4):
+        return self._track(TEXTURE, glGenTextures(1), scope, width * height * bytes_per_pixel)
+
+    def display_list(self, scope, nbytes=0):
+        return self._track(DISPLAY_LIST, glGenLists(1), scope, nbytes)
+
+    def quadric(self, scope):
+        return self._track(QUADRIC, gluNewQuadric(), scope, QUADRIC_BYTES)
+
+    def buffer(self, scope, nbytes=0):
+        return self._track(BUFFER, glGenBuffers(1), scope, nbytes)
+
+    def resize(self, kind, handle, nbytes):
+        record = self.live.get(_key(kind, handle))
+        if record is not None:
+            record.nbytes = nbytes
+
+    def free(self, kind, handle):
+        record = self.live.pop(_key(kind, handle), None)
+        if record is None:
+            if self.debug:
+                print(f"GL debug: free of untracked {kind} {handle}")
+            return
+        if kind == TEXTURE:
+            glDeleteTextures(1, [handle])
+        elif kind == DISPLAY_LIST:
+            glDeleteLists(handle, 1)
+        elif kind == QUADRIC:
+            gluDeleteQuadric(handle)
+        elif kind == BUFFER:
+            glDeleteBuffers(1, [handle])
+        self.freed += 1
+
+    def free_scope(self, scope):
+        for record in [r for r in self.live.values() if r.scope == scope]:
+            self.free(record.kind, record.handle)
+
+    def end_frame(self):
+        # Transient resources still alive here would be leaked every frame
+        leaked = [r for r in self.live.values() if r.scope == SCOPE_FRAME]
+        if leaked and self.debug:
+            self._report_leaks("end of frame", leaked)
+        for record in leaked:
+            self.free(record.kind, record.handle)
+
+    def release_all(self):
+        if self.debug:
+            leaked = [r for r in self.live.values() if r.scope != SCOPE_APP]
+            if leaked:
+                self._report_leaks("shutdown", leaked)
+        for record in list(self.live.values()):
+            self.free(record.kind, record.handle)
+
+    def report(self):
+        summary = {}
+        for record in self.live.values():
+            count, nbytes = summary.get(record.kind, (0, 0))
+            summary[record.kind] = (count + 1, nbytes + record.nbytes)
+        return summary
+
+    def format_report(self):
+        summary = self.report()
+        total = sum(nbytes for _, nbytes in summary.values())
+        parts = [f"{kind} x{count} ({nbytes / 1024:.1f} KB)" for kind, (count, nbytes) in sorted(summary.items())]
+        return (f"GL resources: {len(self.live)} live, ~{total / 1024:.1f} KB; "
+                f"{self.allocated} allocated, {self.freed} freed" + ("; " + ", ".join(parts) if parts else ""))
+
+    def _report_leaks(self, where, records):
+        print(f"GL debug: {len(records)} resource(s) leaked at {where}")
+        for record in records:
+            print(f"  {record.kind} {record.handle} [{record.scope}] ~{record.nbytes} bytes")
+            if record.origin:
+                print(record.origin.rstrip())
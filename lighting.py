@@ -0,0 +1,117 @@
+import math
+from maze import exit_position
+from visibility import has_line_of_sight
+
+# Load-time lighting for the static wall mesh. Every exposed wall face is
+# emitted in world space with a baked colour per vertex holding ambient
+# occlusion and the static lights, so walls can be drawn with GL lighting
+# off. The player's light is a falloff texture projected onto the walls
+# that brightens the baked colour near the player. Faces against another
+# wall and the bottom faces (flush with the floor) are dropped.
+
+# Cube faces as (normal, corners); corners are (x, y, z, u, v) offsets
+# from the cell centre, in the order the old per-cube draw used
+FACES = (
+    ((0, 0, -1), ((1, -1, -1, 0, 0), (1, 1, -1, 1, 0), (-1, 1, -1, 1, 1), (-1, -1, -1, 0, 1))),
+    ((-1, 0, 0), ((-1, -1, -1, 0, 0), (-1, 1, -1, 1, 0), (-1, 1, 1, 1, 1), (-1, -1, 1, 0, 1))),
+    ((0, 0, 1), ((-1, -1, 1, 0, 0), (-1, 1, 1, 1, 0), (1, 1, 1, 1, 1), (1, -1, 1, 0, 1))),
+    ((1, 0, 0), ((1, -1, 1, 0, 0), (1, 1, 1, 1, 0), (1, 1, -1, 1, 1), (1, -1, -1, 0, 1))),
+    ((0, 1, 0), ((1, 1, -1, 0, 0), (1, 1, 1, 1, 0), (-1, 1, 1, 1, 1), (-1, 1, -1, 0, 1))),
+)
+
+WALL_ALBEDO = (0.8, 0.75, 0.7) # unoccluded wall colour; leaves headroom for the static lights
+FLOOR_CONTACT = 0.7 # extra darkening where a wall meets the floor
+AO_NEAR = 1.0 # weight of the cells right in front of a vertex
+AO_FAR = 0.5 # and of the ones a cell further out
+
+START_LIGHT = ((0.9, 0.6, 0.3), 6.0)
+EXIT_LIGHT = ((0.3, 0.9, 0.4), 8.0)
+
+PLAYER_LIGHT = (0.8, 0.7, 0.6) # how much the player's light adds at its centre
+PLAYER_LIGHT_RANGE = 8.0 # world units from the player to where it fades out
+PLAYER_LIGHT_SIZE = 64 # texels across the falloff texture
+
+def static_lights(maze):
+    # As (x, y, z, colour, range)
+    exit_x, exit_z = exit_position(maze)
+    return [(2.0, 0.5, 2.0) + START_LIGHT, (exit_x, 0.0, exit_z) + EXIT_LIGHT]
+
+def _is_wall(maze, r, c):
+    if not (0 <= r < len(maze) and 0 <= c < len(maze[0])): return True
+    return maze[r][c] == 1
+
+def _occlusion(maze, r, c, nr, nc, tr, tc):
+    # Share of open space in front of a vertical wall edge: the two cells
+    # either side of the edge, one and two cells out along the normal. Any
+    # face meeting this edge samples the same cells, so colours agree across
+    # seams; concave corners and narrow corridors come out darker than rooms.
+    open_weight = total = 0.0
+    for depth, weight in ((1, AO_NEAR), (2, AO_FAR)):
+        for side in (0, 1):
+            total += weight
+            if not _is_wall(maze, r + nr * depth + tr * side, c + nc * depth + tc * side):
+                open_weight += weight
+    return open_weight / total
+
+def _light(maze, lights, x, y, z, nx, ny, nz, sx, sz):
+    # Lambert term with range falloff; the shadow ray goes to (sx, sz), a
+    # point just off the face, so it does not start inside the wall
+    rgb = [0.0, 0.0, 0.0]
+    for lx, ly, lz, colour, light_range in lights:
+        dx, dy, dz = lx - x, ly - y, lz - z
+        dist = math.sqrt(dx * dx + dy * dy + dz * dz)
+        if dist >= light_range or dist == 0: continue
+        lambert = (dx * nx + dy * ny + dz * nz) / dist
+        if lambert <= 0: continue
+        if not has_line_of_sight(maze, lx, lz, sx, sz): continue
+        falloff = (1.0 - dist / light_range) ** 2
+        for i in range(3):
+            rgb[i] += colour[i] * lambert * falloff
+    return rgb
+
+def bake_walls(maze, lights=None):
+    # {(r, c): [face, ...]} with four (x, y, z, u, v, red, green, blue)
+    # vertices per face
+    if lights is None:
+        lights = static_lights(maze)
+    baked = {}
+    for r in range(len(maze)):
+        for c in range(len(maze[0])):
+            if maze[r][c] != 1: continue
+            faces = []
+            for (nx, ny, nz), corners in FACES:
+                if ny == 0 and _is_wall(maze, r + nz, c + nx): continue
+                face = []
+                for vx, vy, vz, u, v in corners:
+                    x, y, z = c * 2 + vx, vy, r * 2 + vz
+                    if ny:
+                        ao = 1.0
+                        sx, sz = x - vx * 0.1, z - vz * 0.1
+                    else:
+                        # Lateral direction from the face centre to this edge
+                        tr, tc = (vz, 0) if nx else (0, vx)
+                        ao = _occlusion(maze, r, c, nz, nx, tr, tc)
+                        if vy < 0: ao *= FLOOR_CONTACT
+                        sx, sz = x + nx * 0.1 - tc * 0.1, z + nz * 0.1 - tr * 0.1
+                    lit = _light(maze, lights, x, y, z, nx, ny, nz, sx, sz)
+                    face.append((x, y, z, u, v) + tuple(min(1.0, WALL_ALBEDO[i] * ao + lit[i]) for i in range(3)))
+                faces.append(tuple(face))
+            baked[(r, c)] = faces
+    return baked
+
+def player_light_texels(size=PLAYER_LIGHT_SIZE, colour=PLAYER_LIGHT):
+    # RGB bytes of a radial falloff spanning the light's range. The walls
+    # are modulated by it at twice its value, so 128 leaves the baked
+    # colour alone and brighter texels scale it up by 1 + colour * falloff.
+    data = bytearray()
+    for j in range(size):
+        for i in range(size):
+            d = math.hypot((i + 0.5) * 2 / size - 1, (j + 0.5) * 2 / size - 1)
+            falloff = max(0.0, 1.0 - d) ** 2
+            for channel in colour:
+                data.append(min(255, round(255 * (0.5 + 0.5 * channel * falloff))))
+    return bytes(data)
+
+def bake_stats(baked):
+    faces = sum(len(f) for f in baked.values())
+    return {"walls": len(baked), "faces": faces, "vertices": faces * 4}
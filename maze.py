@@ -0,0 +1,112 @@
+import random
+from entities import EntityStore, KIND_EYE, KIND_TRAP, KIND_POWERUP, KIND_PYRAMID
+
+# Chance per eligible cell
+EYE_DENSITY = 0.05
+TRAP_DENSITY = 0.1
+POWERUP_DENSITY = 0.05
+PYRAMID_DENSITY = 0.03
+
+# Maze generation
+def generate_maze(width, height):
+    real_w = width * 2 + 1
+    real_h = height * 2 + 1
+    maze = [[1 for _ in range(real_w)] for _ in range(real_h)]
+    def get_neighbors(r, c):
+        neighbors = []
+        directions = [(-2, 0), (2, 0), (0, -2), (0, 2)]
+        for dr, dc in directions:
+            nr, nc = r + dr, c + dc
+            if 0 < nr < real_h and 0 < nc < real_w and maze[nr][nc] == 1:
+                neighbors.append((nr, nc))
+        return neighbors
+
+    stack = [(1, 1)]
+    maze[1][1] = 0
+    
+    while stack:
+        current_r, current_c = stack[-1]
+        neighbors = get_neighbors(current_r, current_c)
+        if neighbors:
+            next_r, next_c = random.choice(neighbors)
+            wall_r = current_r + (next_r - current_r) // 2
+            wall_c = current_c + (next_c - current_c) // 2
+            maze[wall_r][wall_c] = 0
+            maze[next_r][next_c] = 0
+            stack.append((next_r, next_c))
+        else:
+            stack.pop()
+    maze[1][1] = 2
+    maze[real_h-2][real_w-2] = 3 
+    return maze
+
+def place_random_eyes(maze, density=EYE_DENSITY):
+    eye_list = []
+    for r in range(len(maze)):
+        for c in range(len(maze[0])):
+            if r < 4 and c < 4: continue
+            if maze[r][c] in [0, 2, 3]: 
+                if random.random() < density: 
+                    eye_list.append([c * 2, r * 2])
+    return eye_list
+
+def place_random_traps(maze, density=TRAP_DENSITY):
+    trap_list = []
+    for r in range(len(maze)):
+        for c in range(len(maze[0])):
+            if r < 4 and c < 4: continue
+            if maze[r][c] == 0: 
+                if random.random() < density: 
+                    trap_list.append((r, c)) 
+    return trap_list
+
+def place_random_powerups(maze, occupied_set, density=POWERUP_DENSITY):
+    cyl_list = []
+    new_occupied = occupied_set.copy()
+    for r in range(len(maze)):
+        for c in range(len(maze[0])):
+            if r < 4 and c < 4: continue
+            if maze[r][c] == 0: 
+                if (r, c) not in new_occupied:
+                    if random.random() < density: 
+                        cyl_list.append([c * 2, r * 2])
+                        new_occupied.add((r, c))
+    return cyl_list, new_occupied
+
+def place_random_pyramids(maze, occupied_set, density=PYRAMID_DENSITY):
+    pyr_list = []
+    for r in range(len(maze)):
+        for c in range(len(maze[0])):
+            if r < 4 and c < 4: continue
+            if maze[r][c] == 0: 
+                if (r, c) not in occupied_set:
+                    if random.random() < density: 
+                        pyr_list.append([c * 2, r * 2])
+    return pyr_list
+
+def populate_entities(maze, eye_density=EYE_DENSITY, trap_density=TRAP_DENSITY,
+                      powerup_density=POWERUP_DENSITY, pyramid_density=PYRAMID_DENSITY):
+    # Generate Objects sequentially to prevent overlap
+    store = EntityStore()
+    traps = place_random_traps(maze, trap_density)
+    occupied = set(traps) # Start tracking occupied spots
+    powerups, occupied = place_random_powerups(maze, occupied, powerup_density)
+    pyramids = place_random_pyramids(maze, occupied, pyramid_density)
+    store.extend(KIND_TRAP, [(c * 2, r * 2) for (r, c) in traps])
+    store.extend(KIND_POWERUP, powerups)
+    store.extend(KIND_PYRAMID, pyramids)
+    store.extend(KIND_EYE, place_random_eyes(maze, eye_density)) # Eyes are separate
+    return store
+
+def get_random_spawn(maze):
+    while True:
+        r = random.randint(0, len(maze)-1)
+        c = random.randint(0, len(maze[0])-1)
+        if r < 4 and c < 4: continue
+        if maze[r][c] != 1:
+            return c * 2, r * 2
+
+def exit_position(maze):
+    finish_r = len(maze) - 2
+    finish_c = len(maze[0]) - 2
+    return finish_c * 2, finish_r * 2
@@ -0,0 +1,210 @@
+import argparse
+import os
+import random
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from simulation import MAZE_WIDTH, MAZE_HEIGHT
+from maze import generate_maze, place_random_traps, TRAP_DENSITY
+from maze_grid import DIRECTIONS, WALL, START, EXIT, shift, open_neighbour_count, distance_field
+
+# Structural metrics over a stream of mazes, written as chunked columnar
+# .npz parts. Mazes are either generated (one seed per chunk, so any chunk
+# can be reproduced) or read from a (N, H, W) .npy file through a memory map.
+# Only a bounded number of chunks is ever in flight, so memory stays flat no
+# matter how many mazes go through.
+
+CORRIDOR_BINS = 32 # lengths 1..31, last bin is 32 and longer
+NO_LABEL = np.iinfo(np.int64).max
+
+def corridor_lengths(open_mask, degree):
+    # A corridor is a maximal run of open cells with exactly two open
+    # neighbours; the dead ends and junctions it connects are not counted.
+    # Runs are labelled by flooding the smallest cell index along them.
+    b, h, w = open_mask.shape
+    inner = open_mask & (degree == 2)
+    label = np.where(inner, np.arange(h * w, dtype=np.int64).reshape(h, w), NO_LABEL)
+    while True:
+        smallest = label
+        for dr, dc in DIRECTIONS:
+            smallest = np.minimum(smallest, shift(label, dr, dc, NO_LABEL))
+        smallest = np.where(inner, smallest, NO_LABEL)
+        if np.array_equal(smallest, label): break
+        label = smallest
+
+    keys = (np.arange(b)[:, None, None] * (h * w) + label)[inner]
+    runs, lengths = np.unique(keys, return_counts=True)
+    owner = runs // (h * w)
+    hist = np.zeros((b, CORRIDOR_BINS), dtype=np.int32)
+    np.add.at(hist, (owner, np.minimum(lengths, CORRIDOR_BINS) - 1), 1)
+    longest = np.zeros(b, dtype=np.int32)
+    np.maximum.at(longest, owner, lengths)
+    return hist, longest
+
+def chunk_metrics(grid, traps):
+    b = len(grid)
+    open_mask = grid != WALL
+    degree = open_neighbour_count(open_mask)
+    open_cells = open_mask.sum(axis=(1, 2))
+
+    dist = distance_field(open_mask, grid == EXIT)
+    start = (grid == START).reshape(b, -1).argmax(axis=1)
+    solution = dist.reshape(b, -1)[np.arange(b), start]
+
+    hist, longest = corridor_lengths(open_mask, degree)
+    columns = {
+        "open_cells": open_cells.astype(np.int32),
+        "dead_ends": (open_mask & (degree == 1)).sum(axis=(1, 2)).astype(np.int32),
+        "junctions": (open_mask & (degree >= 3)).sum(axis=(1, 2)).astype(np.int32),
+        "corridor_hist": hist,
+        "longest_corridor": longest,
+        "solution_length": solution.astype(np.int32),
+    }
+    if traps is None:
+        columns["trap_share"] = np.full(b, np.nan, dtype=np.float32)
+    else:
+        columns["trap_share"] = ((traps & open_mask).sum(axis=(1, 2)) / open_cells).astype(np.float32)
+    return columns
+
+def generated_chunk(task):
+    seed, first, count, width, height, trap_density = task
+    random.seed(seed)
+    grids = np.empty((count, height * 2 + 1, width * 2 + 1), dtype=np.int8)
+    traps = np.zeros(grids.shape, dtype=np.bool_)
+    for i in range(count):
+        maze = generate_maze(width, height)
+        grids[i] = maze
+        for r, c in place_random_traps(maze, trap_density):
+            traps[i, r, c] = True
+    columns = chunk_metrics(grids, traps)
+    columns["index"] = np.arange(first, first + count, dtype=np.int64)
+    columns["seed"] = np.full(count, seed, dtype=np.int64)
+    return columns
+
+def loaded_chunk(task):
+    path, traps_path, first, count = task
+    grids = np.asarray(np.load(path, mmap_mode="r")[first:first + count], dtype=np.int8)
+    traps = None
+    if traps_path:
+        traps = np.asarray(np.load(traps_path, mmap_mode="r")[first:first + count], dtype=np.bool_)
+    columns = chunk_metrics(grids, traps)
+    columns["index"] = np.arange(first, first + count, dtype=np.int64)
+    return columns
+
+class PartWriter:
+    def __init__(self, out_dir, rows_per_part):
+        os.makedirs(out_dir, exist_ok=True)
+        self.out_dir = out_dir
+        self.rows_per_part = rows_per_part
+        self.pending = []
+        self.pending_rows = 0
+        self.parts = 0
+        self.rows = 0
+
+    def write(self, columns):
+        self.pending.append(columns)
+        self.pending_rows += len(columns["index"])
+        if self.pending_rows >= self.rows_per_part:
+            self.flush()
+
+    def flush(self):
+        if not self.pending: return
+        merged = {name: np.concatenate([c[name] for c in self.pending]) for name in self.pending[0]}
+        np.savez(os.path.join(self.out_dir, f"part-{self.parts:05d}.npz"), **merged)
+        self.rows += self.pending_rows
+        self.parts += 1
+        self.pending = []
+        self.pending_rows = 0
+
+class RunningSummary:
+    # Means and extremes accumulated chunk by chunk; NaN values (no trap
+    # data) are left out of both
+    SCALARS = ("dead_ends", "junctions", "longest_corridor", "solution_length", "trap_share")
+
+    def __init__(self):
+        self.count = 0
+        self.counts = dict.fromkeys(self.SCALARS, 0)
+        self.sums = dict.fromkeys(self.SCALARS, 0.0)
+        self.maxes = dict.fromkeys(self.SCALARS, -np.inf)
+        self.hist = np.zeros(CORRIDOR_BINS, dtype=np.int64)
+
+    def add(self, columns):
+        self.count += len(columns["index"])
+        for name in self.SCALARS:
+            values = columns[name].astype(np.float64)
+            values = values[~np.isnan(values)]
+            if not len(values): continue
+            self.counts[name] += len(values)
+            self.sums[name] += float(values.sum())
+            self.maxes[name] = max(self.maxes[name], float(values.max()))
+        self.hist += columns["corridor_hist"].sum(axis=0)
+
+    def print(self):
+        print(f"{self.count} mazes")
+        for name in self.SCALARS:
+            n = self.counts[name]
+            if not n:
+                print(f"  {name:<17} n/a")
+                continue
+            print(f"  {name:<17} mean {self.sums[name] / n:9.3f}  max {self.maxes[name]:9.3f}")
+        total = self.hist.sum()
+        shares = " ".join(f"{i + 1}:{n / total:.3f}" for i, n in enumerate(self.hist[:8])) if total else "-"
+        print(f"  corridor lengths  {shares} ...")
+
+def stream(pool, worker, tasks, window):
+    # Like pool.map, but never more than `window` chunks queued or buffered
+    pending = deque()
+    for task in tasks:
+        pending.append(pool.submit(worker, task))
+        if len(pending) >= window:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+def generated_tasks(args):
+    for i, first in enumerate(range(0, args.count, args.chunk)):
+        yield (args.seed + i, first, min(args.chunk, args.count - first), args.width, args.height, args.trap_density)
+
+def loaded_tasks(args):
+    total = np.load(args.input, mmap_mode="r").shape[0]
+    for first in range(0, total, args.chunk):
+        yield (args.input, args.traps, first, min(args.chunk, total - first))
+
+def main():
+    parser = argparse.ArgumentParser(description="Streaming structural metrics for maze corpora")
+    parser.add_argument("out", help="directory for part-NNNNN.npz column files")
+    parser.add_argument("--input", help="(N, H, W) .npy of maze grids; generate mazes if omitted")
+    parser.add_argument("--traps", help="(N, H, W) boolean .npy of trap cells matching --input")
+    parser.add_argument("--count", type=int, default=10000, help="mazes to generate")
+    parser.add_argument("--width", type=int, default=MAZE_WIDTH)
+    parser.add_argument("--height", type=int, default=MAZE_HEIGHT)
+    parser.add_argument("--trap-density", type=float, default=TRAP_DENSITY)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--chunk", type=int, default=256, help="mazes per vectorised pass")
+    parser.add_argument("--rows-per-part", type=int, default=65536)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    args = parser.parse_args()
+
+    if args.input:
+        worker, tasks = loaded_chunk, loaded_tasks(args)
+    else:
+        worker, tasks = generated_chunk, generated_tasks(args)
+
+    began = time.time()
+    writer = PartWriter(args.out, args.rows_per_part)
+    summary = RunningSummary()
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        for columns in stream(pool, worker, tasks, args.workers * 2):
+            writer.write(columns)
+            summary.add(columns)
+    writer.flush()
+
+    summary.print()
+    elapsed = time.time() - began
+    print(f"wrote {writer.rows} rows in {writer.parts} part(s) to {args.out} in {elapsed:.1f}s")
+
+if __name__ == "__main__":
+    main()
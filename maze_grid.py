@@ -0,0 +1,61 @@
+import numpy as np
+from entities import KIND_EYE, KIND_TRAP, KIND_POWERUP, KIND_PYRAMID
+
+# North, east, south, west as (dr, dc); index order matters to the wall follower
+DIRECTIONS = np.array(((-1, 0), (0, 1), (1, 0), (0, -1)), dtype=np.int64)
+
+WALL = 1
+START = 2
+EXIT = 3
+
+# Array helpers over maze grids. Everything accepts a single (H, W) grid or
+# a batch shaped (B, H, W).
+
+def maze_to_array(maze):
+    return np.asarray(maze, dtype=np.int8)
+
+def entity_grids(store, shape):
+    # Boolean occupancy grid per entity kind, indexed [r, c]
+    grids = {}
+    for kind in (KIND_EYE, KIND_TRAP, KIND_POWERUP, KIND_PYRAMID):
+        grid = np.zeros(shape, dtype=np.bool_)
+        pos = store.positions(kind)
+        if len(pos):
+            cells = np.rint(pos / 2).astype(np.int64)
+            grid[cells[:, 1], cells[:, 0]] = True
+        grids[kind] = grid
+    return grids
+
+def shift(mask, dr, dc, fill=0):
+    # out[..., r, c] = mask[..., r + dr, c + dc], fill past the border
+    out = np.full_like(mask, fill)
+    h, w = mask.shape[-2:]
+    dst_r = slice(max(-dr, 0), h - max(dr, 0))
+    src_r = slice(max(dr, 0), h - max(-dr, 0))
+    dst_c = slice(max(-dc, 0), w - max(dc, 0))
+    src_c = slice(max(dc, 0), w - max(-dc, 0))
+    out[..., dst_r, dst_c] = mask[..., src_r, src_c]
+    return out
+
+def open_neighbour_count(open_mask):
+    count = np.zeros(open_mask.shape, dtype=np.int8)
+    for dr, dc in DIRECTIONS:
+        count += shift(open_mask, dr, dc)
+    return count
+
+def distance_field(open_mask, targets):
+    # Breadth-first distance in cells from any target, expanded one ring per
+    # pass over the whole grid (or batch). Unreachable cells stay -1.
+    dist = np.full(open_mask.shape, -1, dtype=np.int32)
+    frontier = targets & open_mask
+    dist[frontier] = 0
+    d = 0
+    while frontier.any():
+        d += 1
+        grown = np.zeros_like(frontier)
+        for dr, dc in DIRECTIONS:
+            grown |= shift(frontier, dr, dc)
+        grown &= open_mask & (dist < 0)
+        dist[grown] = d
+        frontier = grown
+    return dist
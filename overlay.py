@@ -0,0 +1,138 @@
+import pygame
+from OpenGL.GL import *
+from gl_resources import SCOPE_APP
+
+# 2D overlays composited from one texture atlas. Each panel owns a fixed
+# rectangle of the atlas and is laid out as a stack of text lines; when a
+# panel is shown, only the lines whose text changed since last time are
+# re-rendered and uploaded. Everything queued for the frame is then drawn
+# in a single textured pass, with plain fills sampling a white block.
+
+ATLAS_SIZE = 1024
+WHITE_BLOCK = 4
+
+class Panel:
+    def __init__(self, atlas_x, atlas_y, width, height, background, border, text_x, first_line, pitch, align_bottom):
+        self.pad = 1 if border else 0 # the 2px border straddles the box edge
+        self.atlas_x = atlas_x
+        self.atlas_y = atlas_y
+        self.width = width
+        self.height = height
+        self.background = background
+        self.border = border
+        self.text_x = text_x # None centres each line
+        self.first_line = first_line
+        self.pitch = pitch
+        self.align_bottom = align_bottom
+        self.surface = pygame.Surface((width + self.pad * 2, height + self.pad * 2), pygame.SRCALPHA)
+        self.lines = None
+
+    def band(self, i):
+        # Rows owned by line i; cleared only inside the border
+        top = self.pad + self.first_line + i * self.pitch
+        inset = 1 if self.border else 0
+        inner = pygame.Rect(self.pad + inset, self.pad + inset, self.width - inset * 2, self.height - inset * 2)
+        return top, pygame.Rect(0, top, self.surface.get_width(), self.pitch).clip(inner)
+
+    def redraw(self, lines):
+        # Returns the surface rectangles that changed
+        if self.lines is None or len(lines) != len(self.lines):
+            self.surface.fill(self.background or (0, 0, 0, 0))
+            if self.border:
+                pygame.draw.rect(self.surface, self.border, self.surface.get_rect(), 2)
+            dirty = range(len(lines))
+            changed = [self.surface.get_rect()]
+        else:
+            dirty = [i for i, line in enumerate(lines) if line != self.lines[i]]
+            changed = []
+        for i in dirty:
+            top, band = self.band(i)
+            if self.lines is not None and band.height:
+                self.surface.fill(self.background or (0, 0, 0, 0), band)
+                changed.append(band)
+            if lines[i] is None: continue
+            text, font, color = lines[i]
+            text_surface = font.render(text, True, color)
+            w, h = text_surface.get_size()
+            x = self.pad + (self.text_x if self.text_x is not None else (self.width - w) // 2)
+            y = top + (self.pitch - h if self.align_bottom else 0)
+            self.surface.blit(text_surface, (x, y))
+        self.lines = list(lines)
+        return changed
+
+class OverlayCompositor:
+    def __init__(self, resources):
+        self.resources = resources
+        self.atlas = resources.texture(SCOPE_APP, ATLAS_SIZE, ATLAS_SIZE)
+        glBindTexture(GL_TEXTURE_2D, self.atlas)
+        glTexImage2D(GL_TEXTURE_2D, 0, GL_RGBA, ATLAS_SIZE, ATLAS_SIZE, 0, GL_RGBA, GL_UNSIGNED_BYTE, None)
+        # Panels are drawn 1:1 with the screen, so no filtering is wanted
+        glTexParameterf(GL_TEXTURE_2D, GL_TEXTURE_MIN_FILTER, GL_NEAREST)
+        glTexParameterf(GL_TEXTURE_2D, GL_TEXTURE_MAG_FILTER, GL_NEAREST)
+        glTexSubImage2D(GL_TEXTURE_2D, 0, 0, 0, WHITE_BLOCK, WHITE_BLOCK, GL_RGBA, GL_UNSIGNED_BYTE,
+                        b"\xff" * (WHITE_BLOCK * WHITE_BLOCK * 4))
+        self.panels = {}
+        # Shelf packer; the white block sits at the start of the first shelf
+        self.cursor_x = WHITE_BLOCK
+        self.cursor_y = 0
+        self.shelf_h = WHITE_BLOCK
+        self.layers = []
+        self.uploaded = 0
+
+    def add_panel(self, name, width, height, background=None, border=None,
+                  text_x=None, first_line=0, pitch=25, align_bottom=False):
+        pad = 2 if border else 0
+        w, h = width + pad, height + pad
+        if self.cursor_x + w > ATLAS_SIZE:
+            self.cursor_x = 0
+            self.cursor_y += self.shelf_h
+            self.shelf_h = 0
+        if self.cursor_y + h > ATLAS_SIZE:
+            raise ValueError(f"overlay atlas is full, cannot fit panel {name!r}")
+        self.panels[name] = Panel(self.cursor_x, self.cursor_y, width, height, background, border,
+                                  text_x, first_line, pitch, align_bottom)
+        self.cursor_x += w
+        self.shelf_h = max(self.shelf_h, h)
+
+    def panel(self, name, x, y, lines, color=(1, 1, 1, 1)):
+        # Queue a panel with its box's bottom-left corner at (x, y);
+        # lines are (text, font, color) tuples or None for a gap
+        panel = self.panels[name]
+        changed = panel.redraw(lines)
+        if changed:
+            glBindTexture(GL_TEXTURE_2D, self.atlas)
+            for rect in changed:
+                data = pygame.image.tostring(panel.surface.subsurface(rect), "RGBA")
+                glTexSubImage2D(GL_TEXTURE_2D, 0, panel.atlas_x + rect.x, panel.atlas_y + rect.y,
+                                rect.width, rect.height, GL_RGBA, GL_UNSIGNED_BYTE, data)
+                self.uploaded += len(data)
+        w, h = panel.surface.get_size()
+        self.layers.append(((panel.atlas_x, panel.atlas_y, w, h), (x - panel.pad, y - panel.pad), color))
+
+    def fill(self, x, y, w, h, color):
+        self.layers.append((None, (x, y, w, h), color))
+
+    def draw(self):
+        # Expects an ortho projection with blending on
+        if not self.layers: return
+        glEnable(GL_TEXTURE_2D)
+        glBindTexture(GL_TEXTURE_2D, self.atlas)
+        white = (WHITE_BLOCK / 2) / ATLAS_SIZE
+        glBegin(GL_QUADS)
+        for source, target, color in self.layers:
+            glColor4f(*color)
+            if source is None:
+                x, y, w, h = target
+                u0 = u1 = v0 = v1 = white
+            else:
+                ax, ay, w, h = source
+                x, y = target
+                # Atlas rows run top-down, screen y runs up
+                u0, u1 = ax / ATLAS_SIZE, (ax + w) / ATLAS_SIZE
+                v0, v1 = ay / ATLAS_SIZE, (ay + h) / ATLAS_SIZE
+            glTexCoord2f(u0, v1); glVertex2f(x, y)
+            glTexCoord2f(u1, v1); glVertex2f(x + w, y)
+            glTexCoord2f(u1, v0); glVertex2f(x + w, y + h)
+            glTexCoord2f(u0, v0); glVertex2f(x, y + h)
+        glEnd()
+        self.layers = []
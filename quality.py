@@ -0,0 +1,58 @@
+from collections import deque, namedtuple
+
+QualitySettings = namedtuple("QualitySettings", "sphere_slices fog_end minimap_interval render_scale far_plane")
+
+# Best first. Each step trades a little image quality for frame time;
+# minimap_interval is seconds between minimap rebuilds (0 = every frame).
+LEVELS = (
+    QualitySettings(32, 15.0, 0.0, 1.0, 50.0),
+    QualitySettings(24, 15.0, 0.1, 1.0, 40.0),
+    QualitySettings(16, 13.0, 0.25, 0.85, 30.0),
+    QualitySettings(12, 11.0, 0.5, 0.7, 22.0),
+    QualitySettings(8, 9.0, 1.0, 0.5, 16.0),
+)
+
+Decision = namedtuple("Decision", "time old_level new_level avg_frame_ms budget_ms")
+
+# Keeps a smoothed frame time close to the budget for the target rate by
+# stepping through LEVELS. Drops quality as soon as the average runs over
+# budget, and only raises it again once there is clear headroom, with a
+# cooldown between changes so it does not oscillate.
+class QualityGovernor:
+    def __init__(self, target_fps, level=0, smoothing=0.1, cooldown=1.0,
+                 over_budget=1.05, headroom=0.7, on_change=None):
+        self.budget = 1.0 / target_fps
+        self.level = level
+        self.smoothing = smoothing
+        self.cooldown = cooldown
+        self.over_budget = over_budget
+        self.headroom = headroom
+        self.on_change = on_change
+        self.avg = self.budget
+        self.last_change = None
+        self.decisions = deque(maxlen=256)
+
+    @property
+    def settings(self):
+        return LEVELS[self.level]
+
+    def frame(self, frame_time, now):
+        # frame_time is the work done this frame, not including the frame cap sleep
+        self.avg += (frame_time - self.avg) * self.smoothing
+        if self.last_change is not None and now - self.last_change < self.cooldown:
+            return self.settings
+
+        new_level = self.level
+        if self.avg > self.budget * self.over_budget and self.level < len(LEVELS) - 1:
+            new_level = self.level + 1
+        elif self.avg < self.budget * self.headroom and self.level > 0:
+            new_level = self.level - 1
+
+        if new_level != self.level:
+            decision = Decision(now, self.level, new_level, self.avg * 1000, self.budget * 1000)
+            self.decisions.append(decision)
+            self.level = new_level
+            self.last_change = now
+            if self.on_change:
+                self.on_change(decision, self.settings)
+        return self.settings
@@ -0,0 +1,709 @@
+import pygame
+from OpenGL.GL import *
+from OpenGL.GLU import *
+import math
+import time
+from gl_resources import GLResources, TEXTURE, DISPLAY_LIST, SCOPE_APP, SCOPE_LEVEL, SCOPE_FRAME
+from quality import LEVELS
+from entities import KIND_EYE, KIND_TRAP, KIND_POWERUP, KIND_PYRAMID
+from maze import exit_position
+from visibility import build_pvs, pvs_cells, pvs_stats, eyes_seeing_player, world_to_cell
+from lighting import bake_walls, bake_stats, player_light_texels, PLAYER_LIGHT_SIZE, PLAYER_LIGHT_RANGE
+from overlay import OverlayCompositor
+
+DISPLAY_SIZE = (800, 600)
+
+# Textures
+WALL_TEXTURE_FILE = "wall_texture.jpg"
+FLOOR_TEXTURE_FILE = "floor_texture.jpg"
+EYE_TEXTURE_FILE = "red_eye_texture.png" 
+TRAP_TEXTURE_FILE = "rust_texture.jpg" 
+
+# Renderer state
+resources = None
+maze_map = []
+entities = None
+game_font = None 
+big_font = None 
+maze_display_list = None
+wall_faces = {} # baked wall mesh for the current maze, keyed by (r, c)
+pvs = []
+pvs_wall_lists = {}
+visible_cells = None # set of cell indices in the player's PVS, None draws everything
+diamond_rot = 0 
+eye_quadric = None
+pickup_quadric = None
+quality = LEVELS[0]
+scene_tex_id = None # reduced-resolution 3D pass is copied here and upscaled
+minimap_list = None
+minimap_built_at = 0
+minimap_icons = None
+overlays = None
+
+def init_renderer(debug=False):
+    global resources, game_font, big_font, wall_tex_id, floor_tex_id, eye_tex_id, trap_tex_id, eye_quadric, pickup_quadric, scene_tex_id, overlays, player_light_tex_id
+
+    resources = GLResources(debug)
+
+    pygame.display.set_mode(DISPLAY_SIZE, pygame.DOUBLEBUF | pygame.OPENGL)
+    pygame.display.set_caption("Horror Maze")
+
+    game_font = pygame.font.SysFont("Arial", 18, bold=True) 
+    big_font = pygame.font.SysFont("Arial", 40, bold=True) 
+
+    glEnable(GL_DEPTH_TEST)
+    glEnable(GL_TEXTURE_2D)
+    glEnable(GL_LIGHTING)
+    glEnable(GL_LIGHT0)
+    glEnable(GL_COLOR_MATERIAL)
+    glColorMaterial(GL_FRONT_AND_BACK, GL_AMBIENT_AND_DIFFUSE)
+    
+    # Init Fog
+    glEnable(GL_FOG)
+    glFogi(GL_FOG_MODE, GL_LINEAR)
+    glFogf(GL_FOG_START, 2.0)
+    glFogf(GL_FOG_END, 15.0)
+    
+    # Init Light
+    glLightf(GL_LIGHT0, GL_CONSTANT_ATTENUATION, 0.1)
+    glLightf(GL_LIGHT0, GL_LINEAR_ATTENUATION, 0.1)
+    glLightf(GL_LIGHT0, GL_QUADRATIC_ATTENUATION, 0.05)
+    
+    wall_tex_id = load_image_texture(WALL_TEXTURE_FILE)
+    floor_tex_id = load_image_texture(FLOOR_TEXTURE_FILE)
+    eye_tex_id = load_image_texture(EYE_TEXTURE_FILE)
+    trap_tex_id = load_image_texture(TRAP_TEXTURE_FILE) 
+    player_light_tex_id = create_player_light_texture()
+
+    eye_quadric = resources.quadric(SCOPE_APP)
+    gluQuadricTexture(eye_quadric, GL_TRUE)
+    pickup_quadric = resources.quadric(SCOPE_APP)
+
+    scene_tex_id = resources.texture(SCOPE_APP, DISPLAY_SIZE[0], DISPLAY_SIZE[1], 3)
+    glBindTexture(GL_TEXTURE_2D, scene_tex_id)
+    glTexImage2D(GL_TEXTURE_2D, 0, GL_RGB, DISPLAY_SIZE[0], DISPLAY_SIZE[1], 0, GL_RGB, GL_UNSIGNED_BYTE, None)
+    glTexParameterf(GL_TEXTURE_2D, GL_TEXTURE_MIN_FILTER, GL_LINEAR)
+    glTexParameterf(GL_TEXTURE_2D, GL_TEXTURE_MAG_FILTER, GL_LINEAR)
+    glTexParameterf(GL_TEXTURE_2D, GL_TEXTURE_WRAP_S, GL_CLAMP_TO_EDGE)
+    glTexParameterf(GL_TEXTURE_2D, GL_TEXTURE_WRAP_T, GL_CLAMP_TO_EDGE)
+
+    overlays = OverlayCompositor(resources)
+    overlays.add_panel("hud", 220, 220, background=(0, 0, 0, 128), border=(255, 255, 255, 255),
+                       text_x=15, first_line=10, pitch=25)
+    overlays.add_panel("legend", 320, 180, background=(0, 0, 0, 204), border=(255, 255, 255, 255),
+                       text_x=20, first_line=0, pitch=30, align_bottom=True)
+    overlays.add_panel("victory", DISPLAY_SIZE[0], 320, first_line=10, pitch=50, align_bottom=True)
+
+def set_quality(settings):
+    global quality
+    quality = settings
+
+def scene_size():
+    return (max(1, int(DISPLAY_SIZE[0] * quality.render_scale)),
+            max(1, int(DISPLAY_SIZE[1] * quality.render_scale)))
+
+def shutdown_renderer():
+    global minimap_list
+    if resources.debug:
+        print(resources.format_report())
+    # The current level's lists are owned here, not leaked; anything left
+    # after this is reported by release_all
+    resources.free_scope(SCOPE_LEVEL)
+    pvs_wall_lists.clear()
+    minimap_list = None
+    resources.release_all()
+
+def end_frame():
+    resources.end_frame()
+
+def set_level(maze, store, ready_pvs=None):
+    global maze_map, entities, maze_display_list, minimap_list
+    # Everything built for the previous maze goes with it
+    resources.free_scope(SCOPE_LEVEL)
+    pvs_wall_lists.clear()
+    minimap_list = None
+    maze_map = maze
+    entities = store
+    bake_lighting()
+    maze_display_list = create_maze_display_list() 
+    rebuild_pvs(ready_pvs)
+
+def update_entities(store):
+    global entities
+    entities = store
+
+def begin_frame(player_x, player_z, player_yaw, cam_y, launched):
+    scene_w, scene_h = scene_size()
+    glViewport(0, 0, scene_w, scene_h)
+    glMatrixMode(GL_PROJECTION)
+    glLoadIdentity()
+    gluPerspective(45, (DISPLAY_SIZE[0]/DISPLAY_SIZE[1]), 0.1, 50.0 if launched else quality.far_plane)
+    glMatrixMode(GL_MODELVIEW)
+
+    glLoadIdentity()
+    glLightfv(GL_LIGHT0, GL_POSITION, (0, 0, 0, 1))
+    
+    # Use bright map view when launched
+    if launched:
+        glFogfv(GL_FOG_COLOR, (0, 0, 0, 1))
+        glFogf(GL_FOG_START, 20.0) # Push fog back
+        glFogf(GL_FOG_END, 60.0) 
+        glLightfv(GL_LIGHT0, GL_AMBIENT, (0.5, 0.5, 0.5, 1.0))
+        glLightfv(GL_LIGHT0, GL_DIFFUSE, (1.0, 1.0, 1.0, 1.0))
+    else:
+        glFogfv(GL_FOG_COLOR, (0, 0, 0, 1)) 
+        glFogf(GL_FOG_START, 2.0)
+        glFogf(GL_FOG_END, quality.fog_end)
+        glLightfv(GL_LIGHT0, GL_AMBIENT, (0.1, 0.1, 0.1, 1.0)) 
+        glLightfv(GL_LIGHT0, GL_DIFFUSE, (0.8, 0.7, 0.6, 1.0)) 
+
+    target_x = player_x + math.sin(math.radians(player_yaw))
+    target_z = player_z - math.cos(math.radians(player_yaw))
+    gluLookAt(player_x, cam_y, player_z, target_x, 0, target_z, 0, 1, 0)
+
+    glClear(GL_COLOR_BUFFER_BIT | GL_DEPTH_BUFFER_BIT)
+    glColor3f(1, 1, 1) 
+    glEnable(GL_TEXTURE_2D)
+
+def draw_world(player_x, player_z, player_yaw, launched):
+    draw_floor()
+    draw_visible_walls(player_x, player_z, launched)
+    draw_traps() 
+    draw_spheres(player_x, player_z, player_yaw)
+    draw_powerups() 
+    draw_pyramids() # Draw Pyramids
+    draw_diamond()
+
+def resolve_scene():
+    # Stretch a reduced-resolution 3D pass over the full window
+    if quality.render_scale >= 1.0: return
+    scene_w, scene_h = scene_size()
+    glBindTexture(GL_TEXTURE_2D, scene_tex_id)
+    glCopyTexSubImage2D(GL_TEXTURE_2D, 0, 0, 0, 0, 0, scene_w, scene_h)
+    glViewport(0, 0, DISPLAY_SIZE[0], DISPLAY_SIZE[1])
+
+    set_ortho_projection()
+    glDisable(GL_BLEND)
+    glEnable(GL_TEXTURE_2D)
+    glColor3f(1, 1, 1)
+    u = scene_w / DISPLAY_SIZE[0]
+    v = scene_h / DISPLAY_SIZE[1]
+    glBegin(GL_QUADS)
+    glTexCoord2f(0, 0); glVertex2f(0, 0)
+    glTexCoord2f(u, 0); glVertex2f(DISPLAY_SIZE[0], 0)
+    glTexCoord2f(u, v); glVertex2f(DISPLAY_SIZE[0], DISPLAY_SIZE[1])
+    glTexCoord2f(0, v); glVertex2f(0, DISPLAY_SIZE[1])
+    glEnd()
+    restore_perspective_projection()
+
+wall_tex_id = None
+floor_tex_id = None
+eye_tex_id = None
+trap_tex_id = None
+player_light_tex_id = None
+
+def load_image_texture(filename):
+    try:
+        textureSurface = pygame.image.load(filename)
+    except pygame.error as e:
+        print(f"Error loading {filename}: {e}")
+        pygame.quit(); quit()
+    textureData = pygame.image.tostring(textureSurface, "RGB", 1)
+    width = textureSurface.get_width()
+    height = textureSurface.get_height()
+    glEnable(GL_TEXTURE_2D)
+    texid = resources.texture(SCOPE_APP, width, height, 3)
+    glBindTexture(GL_TEXTURE_2D, texid)
+    glTexImage2D(GL_TEXTURE_2D, 0, GL_RGB, width, height, 0, GL_RGB, GL_UNSIGNED_BYTE, textureData)
+    glTexParameterf(GL_TEXTURE_2D, GL_TEXTURE_WRAP_S, GL_REPEAT)
+    glTexParameterf(GL_TEXTURE_2D, GL_TEXTURE_WRAP_T, GL_REPEAT)
+    glTexParameterf(GL_TEXTURE_2D, GL_TEXTURE_MAG_FILTER, GL_LINEAR)
+    glTexParameterf(GL_TEXTURE_2D, GL_TEXTURE_MIN_FILTER, GL_LINEAR)
+    return texid
+
+def load_text_texture(font, line, color):
+    text_surface = font.render(line, True, color)
+    text_data = pygame.image.tostring(text_surface, "RGBA", 1)
+    w, h = text_surface.get_width(), text_surface.get_height()
+    
+    tex_id = resources.texture(SCOPE_FRAME, w, h)
+    glBindTexture(GL_TEXTURE_2D, tex_id)
+    glTexImage2D(GL_TEXTURE_2D, 0, GL_RGBA, w, h, 0, GL_RGBA, GL_UNSIGNED_BYTE, text_data)
+    glTexParameterf(GL_TEXTURE_2D, GL_TEXTURE_MIN_FILTER, GL_LINEAR)
+    glTexParameterf(GL_TEXTURE_2D, GL_TEXTURE_MAG_FILTER, GL_LINEAR)
+    return tex_id, w, h
+
+def draw_textured_quad(x_pos, y_pos, w, h):
+    glBegin(GL_QUADS)
+    glTexCoord2f(0, 0); glVertex2f(x_pos, y_pos)
+    glTexCoord2f(1, 0); glVertex2f(x_pos + w, y_pos)
+    glTexCoord2f(1, 1); glVertex2f(x_pos + w, y_pos + h)
+    glTexCoord2f(0, 1); glVertex2f(x_pos, y_pos + h)
+    glEnd()
+
+def create_player_light_texture():
+    # Texture unit 1 multiplies whatever unit 0 produced by twice the
+    # falloff texel; only the walls ever enable it
+    size = PLAYER_LIGHT_SIZE
+    tex_id = resources.texture(SCOPE_APP, size, size, 3)
+    glActiveTexture(GL_TEXTURE1)
+    glBindTexture(GL_TEXTURE_2D, tex_id)
+    glTexImage2D(GL_TEXTURE_2D, 0, GL_RGB, size, size, 0, GL_RGB, GL_UNSIGNED_BYTE, player_light_texels())
+    glTexParameterf(GL_TEXTURE_2D, GL_TEXTURE_MIN_FILTER, GL_LINEAR)
+    glTexParameterf(GL_TEXTURE_2D, GL_TEXTURE_MAG_FILTER, GL_LINEAR)
+    glTexParameterf(GL_TEXTURE_2D, GL_TEXTURE_WRAP_S, GL_CLAMP_TO_EDGE)
+    glTexParameterf(GL_TEXTURE_2D, GL_TEXTURE_WRAP_T, GL_CLAMP_TO_EDGE)
+    glTexEnvi(GL_TEXTURE_ENV, GL_TEXTURE_ENV_MODE, GL_COMBINE)
+    glTexEnvi(GL_TEXTURE_ENV, GL_COMBINE_RGB, GL_MODULATE)
+    glTexEnvi(GL_TEXTURE_ENV, GL_SOURCE0_RGB, GL_PREVIOUS)
+    glTexEnvi(GL_TEXTURE_ENV, GL_SOURCE1_RGB, GL_TEXTURE)
+    glTexEnvf(GL_TEXTURE_ENV, GL_RGB_SCALE, 2.0)
+    glTexGeni(GL_S, GL_TEXTURE_GEN_MODE, GL_OBJECT_LINEAR)
+    glTexGeni(GL_T, GL_TEXTURE_GEN_MODE, GL_OBJECT_LINEAR)
+    glActiveTexture(GL_TEXTURE0)
+    return tex_id
+
+def begin_player_light(px, pz):
+    # Wall vertices are in world space, so object-linear texgen centres the
+    # falloff texture on the player with two planes per frame
+    scale = 1.0 / (2 * PLAYER_LIGHT_RANGE)
+    glActiveTexture(GL_TEXTURE1)
+    glEnable(GL_TEXTURE_2D)
+    glBindTexture(GL_TEXTURE_2D, player_light_tex_id)
+    glTexGenfv(GL_S, GL_OBJECT_PLANE, (scale, 0, 0, 0.5 - px * scale))
+    glTexGenfv(GL_T, GL_OBJECT_PLANE, (0, 0, scale, 0.5 - pz * scale))
+    glEnable(GL_TEXTURE_GEN_S)
+    glEnable(GL_TEXTURE_GEN_T)
+    glActiveTexture(GL_TEXTURE0)
+
+def end_player_light():
+    glActiveTexture(GL_TEXTURE1)
+    glDisable(GL_TEXTURE_GEN_S)
+    glDisable(GL_TEXTURE_GEN_T)
+    glDisable(GL_TEXTURE_2D)
+    glActiveTexture(GL_TEXTURE0)
+
+def draw_walls(walls):
+    # Baked occlusion and static lights ride in the vertex colour, so no
+    # per-vertex lighting is done for the walls; the player's light comes
+    # from begin_player_light around the call
+    glDisable(GL_LIGHTING)
+    glBindTexture(GL_TEXTURE_2D, wall_tex_id)
+    glBegin(GL_QUADS)
+    for key in walls:
+        for face in wall_faces[key]:
+            for x, y, z, u, v, red, green, blue in face:
+                glColor3f(red, green, blue)
+                glTexCoord2f(u, v)
+                glVertex3f(x, y, z)
+    glEnd()
+    glColor3f(1, 1, 1)
+    glEnable(GL_LIGHTING)
+
+# Rough driver-side cost of one compiled wall face: 4 vertices with
+# position, texcoord and colour
+FACE_LIST_BYTES = 4 * 32
+
+def wall_list_bytes(walls):
+    return sum(len(wall_faces[key]) for key in walls) * FACE_LIST_BYTES
+
+def bake_lighting():
+    global wall_faces
+    bake_start = time.time()
+    wall_faces = bake_walls(maze_map)
+    stats = bake_stats(wall_faces)
+    print(f"Lighting: {stats['faces']} faces over {stats['walls']} walls, {time.time() - bake_start:.2f}s")
+
+def create_maze_display_list():
+    walls = sorted(wall_faces)
+    new_list_id = resources.display_list(SCOPE_LEVEL, wall_list_bytes(walls))
+    glNewList(new_list_id, GL_COMPILE)
+    draw_walls(walls)
+    glEndList()
+    return new_list_id
+
+def create_pvs_wall_list(cells):
+    cols = len(maze_map[0])
+    walls = [divmod(i, cols) for i in cells if maze_map[i // cols][i % cols] == 1]
+    new_list_id = resources.display_list(SCOPE_LEVEL, wall_list_bytes(walls))
+    glNewList(new_list_id, GL_COMPILE)
+    draw_walls(walls)
+    glEndList()
+    return new_list_id
+
+def rebuild_pvs(ready_pvs=None):
+    # The simulation thread normally hands the PVS over with the maze
+    global pvs
+    build_start = time.time()
+    pvs = ready_pvs if ready_pvs is not None else build_pvs(maze_map)
+    stats = pvs_stats(pvs)
+    print(f"PVS: {stats['cells']} cells, avg {stats['visible_avg']:.1f} visible, "
+          f"{time.time() - build_start:.2f}s, {stats['bytes'] / 1024:.1f} KB")
+
+def draw_visible_walls(px, pz, launched):
+    # Walls outside the player's PVS are never submitted
+    global visible_cells
+    cells = pvs_cells(pvs, maze_map, px, pz)
+    begin_player_light(px, pz)
+    if launched or cells is None:
+        visible_cells = None
+        glCallList(maze_display_list)
+    else:
+        r, c = world_to_cell(px, pz)
+        key = r * len(maze_map[0]) + c
+        if key not in pvs_wall_lists:
+            pvs_wall_lists[key] = create_pvs_wall_list(cells)
+        visible_cells = set(cells)
+        glCallList(pvs_wall_lists[key])
+    end_player_light()
+
+def cell_visible(x, z):
+    if visible_cells is None: return True
+    r, c = world_to_cell(x, z)
+    return r * len(maze_map[0]) + c in visible_cells
+
+def draw_spheres(player_x, player_z, player_yaw):
+    glBindTexture(GL_TEXTURE_2D, eye_tex_id)
+    glEnable(GL_BLEND)
+    glBlendFunc(GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA)
+    
+    # Only eyes with a clear line of sight are drawn turned towards the player
+    spheres = entities.positions(KIND_EYE).tolist()
+    watching = set(eyes_seeing_player(maze_map, visible_cells, spheres, player_x, player_z))
+    
+    for i, (sx, sz) in enumerate(spheres):
+        if not cell_visible(sx, sz): continue
+        
+        glPushMatrix()
+        glTranslatef(sx, -0.3, sz)
+        if i in watching:
+            dx = player_x - sx
+            dz = player_z - sz
+            angle = math.degrees(math.atan2(dx, dz)) + 180
+            glRotatef(angle, 0, 1, 0)
+        glRotatef(90, 1, 0, 0)
+        
+        glColor4f(1, 1, 1, 1)
+        gluSphere(eye_quadric, 0.3, quality.sphere_slices, quality.sphere_slices)
+        glPopMatrix()
+    
+    glDisable(GL_BLEND)
+
+def draw_powerups():
+    glDisable(GL_TEXTURE_2D)
+    glMaterialfv(GL_FRONT, GL_EMISSION, [1.0, 1.0, 0.0, 1.0])
+    glColor3f(1.0, 1.0, 0.0) 
+    
+    bob_height = math.sin(time.time() * 5.0) * 0.1
+    
+    for px, pz in entities.positions(KIND_POWERUP).tolist():
+        if not cell_visible(px, pz): continue
+        glPushMatrix()
+        glTranslatef(px, -0.7 + bob_height, pz) 
+        glRotatef(diamond_rot, 0, 1, 0) 
+        gluSphere(pickup_quadric, 0.2, quality.sphere_slices, quality.sphere_slices)
+        glPopMatrix()
+        
+    glMaterialfv(GL_FRONT, GL_EMISSION, [0, 0, 0, 1])
+    glEnable(GL_TEXTURE_2D)
+    glColor3f(1, 1, 1) 
+
+def draw_pyramids():
+    glDisable(GL_TEXTURE_2D)
+    glMaterialfv(GL_FRONT, GL_EMISSION, [0.5, 0.0, 0.8, 1.0])
+    glColor3f(0.5, 0.0, 0.8) 
+    bob_height = math.sin(time.time() * 3.0) * 0.1
+    
+    for px, pz in entities.positions(KIND_PYRAMID).tolist():
+        if not cell_visible(px, pz): continue
+        glPushMatrix()
+        glTranslatef(px, -0.7 + bob_height, pz)
+        glRotatef(diamond_rot, 0, 1, 0) 
+        glScalef(0.4, 0.4, 0.4) 
+        glBegin(GL_TRIANGLES)
+        glVertex3f(0, 1, 0); glVertex3f(-1, -1, 1); glVertex3f(1, -1, 1)
+        glVertex3f(0, 1, 0); glVertex3f(1, -1, 1); glVertex3f(1, -1, -1)
+        glVertex3f(0, 1, 0); glVertex3f(1, -1, -1); glVertex3f(-1, -1, -1)
+        glVertex3f(0, 1, 0); glVertex3f(-1, -1, -1); glVertex3f(-1, -1, 1)
+        glEnd()
+        glBegin(GL_QUADS)
+        glVertex3f(-1, -1, 1); glVertex3f(1, -1, 1); glVertex3f(1, -1, -1); glVertex3f(-1, -1, -1)
+        glEnd()
+        glPopMatrix()
+
+    glMaterialfv(GL_FRONT, GL_EMISSION, [0, 0, 0, 1])
+    glEnable(GL_TEXTURE_2D)
+    glColor3f(1, 1, 1) 
+
+def draw_diamond():
+    global diamond_rot
+    diamond_rot = (diamond_rot + 2) % 360
+    x, z = exit_position(maze_map)
+    glPushMatrix()
+    glTranslatef(x, 0, z) 
+    glRotatef(diamond_rot, 0, 1, 0) 
+    glScalef(0.5, 0.5, 0.5) 
+    glDisable(GL_TEXTURE_2D)
+    glMaterialfv(GL_FRONT, GL_EMISSION, [0.0, 1.0, 0.0, 1]) 
+    glColor3f(0.0, 1.0, 0.0) 
+    glBegin(GL_TRIANGLES)
+    # Top
+    glVertex3f(0, 1, 0); glVertex3f(1, 0, 0); glVertex3f(0, 0, 1)
+    glVertex3f(0, 1, 0); glVertex3f(0, 0, 1); glVertex3f(-1, 0, 0)
+    glVertex3f(0, 1, 0); glVertex3f(-1, 0, 0); glVertex3f(0, 0, -1)
+    glVertex3f(0, 1, 0); glVertex3f(0, 0, -1); glVertex3f(1, 0, 0)
+    # Bottom
+    glVertex3f(0, -1, 0); glVertex3f(0, 0, 1); glVertex3f(1, 0, 0)
+    glVertex3f(0, -1, 0); glVertex3f(-1, 0, 0); glVertex3f(0, 0, 1)
+    glVertex3f(0, -1, 0); glVertex3f(0, 0, -1); glVertex3f(-1, 0, 0)
+    glVertex3f(0, -1, 0); glVertex3f(1, 0, 0); glVertex3f(0, 0, -1)
+    glEnd()
+    glMaterialfv(GL_FRONT, GL_EMISSION, [0, 0, 0, 1])
+    glEnable(GL_TEXTURE_2D)
+    glPopMatrix()
+
+def draw_floor():
+    glBindTexture(GL_TEXTURE_2D, floor_tex_id)
+    tile_count = 100 
+    glBegin(GL_QUADS)
+    glNormal3f(0, 1, 0)
+    glTexCoord2f(0, 0); glVertex3f(-100, -1, -100)
+    glTexCoord2f(tile_count, 0); glVertex3f(100, -1, -100)
+    glTexCoord2f(tile_count, tile_count); glVertex3f(100, -1, 100)
+    glTexCoord2f(0, tile_count); glVertex3f(-100, -1, 100)
+    glEnd()
+
+def draw_traps():
+    glBindTexture(GL_TEXTURE_2D, trap_tex_id)
+    glBegin(GL_QUADS)
+    glNormal3f(0, 1, 0)
+    for x, z in entities.positions(KIND_TRAP).tolist():
+        if not cell_visible(x, z): continue
+        y = -0.99 
+        glTexCoord2f(0, 0); glVertex3f(x - 1, y, z - 1)
+        glTexCoord2f(1, 0); glVertex3f(x + 1, y, z - 1)
+        glTexCoord2f(1, 1); glVertex3f(x + 1, y, z + 1)
+        glTexCoord2f(0, 1); glVertex3f(x - 1, y, z + 1)
+    glEnd()
+
+def set_ortho_projection():
+    glMatrixMode(GL_PROJECTION)
+    glPushMatrix()
+    glLoadIdentity()
+    gluOrtho2D(0, DISPLAY_SIZE[0], 0, DISPLAY_SIZE[1])
+    glMatrixMode(GL_MODELVIEW)
+    glPushMatrix()
+    glLoadIdentity()
+    glDisable(GL_DEPTH_TEST)
+    glDisable(GL_LIGHTING)
+    glEnable(GL_BLEND)
+    glBlendFunc(GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA)
+
+def restore_perspective_projection():
+    glDisable(GL_BLEND)
+    glEnable(GL_LIGHTING)
+    glEnable(GL_DEPTH_TEST)
+    glEnable(GL_TEXTURE_2D) 
+    glMatrixMode(GL_PROJECTION)
+    glPopMatrix()
+    glMatrixMode(GL_MODELVIEW)
+    glPopMatrix()
+
+# HUD, legend, blindness and victory are queued on the overlay compositor
+# and drawn together by composite_overlays once the frame's 2D is known
+
+def draw_hud_menu(elapsed, px, pz):
+    menu_h, margin = 220, 20
+    white = (255, 255, 255, 255)
+    lines = [f"Time: {elapsed}s", f"Pos: {int(px/2)}, {int(pz/2)}", "----------------", "[R] Reset", "[G] New Maze", "[M] Toggle Map", "[L] Legend", "[Z] Slow Walk"]
+    overlays.panel("hud", margin, DISPLAY_SIZE[1] - margin - menu_h, [(line, game_font, white) for line in lines])
+
+LEGEND_LINES = [
+    ("LEGEND:", (255, 255, 255, 255)), # White
+    ("Eyeball = TELEPORTS YOU", (200, 50, 50, 255)), # Red
+    ("Rusty Floor = SLOWS YOU", (200, 150, 100, 255)), # Rusty
+    ("Yellow Sphere = SPEED BOOST", (255, 255, 0, 255)), # Yellow
+    ("Purple Pyramid = MAP VIEW", (200, 0, 255, 255)), # Purple
+]
+
+def draw_legend():
+    legend_w, legend_h = 320, 180
+    center_x = DISPLAY_SIZE[0] / 2 - legend_w / 2
+    center_y = DISPLAY_SIZE[1] / 2 - legend_h / 2
+    overlays.panel("legend", int(center_x), int(center_y), [(line, game_font, color) for line, color in LEGEND_LINES])
+
+def draw_blindness_effect(diff):
+    # 3.0 seconds total (0.5 in, 2.5 out)
+    alpha = 0
+    if diff < 0.5:
+        alpha = diff / 0.5 
+    elif diff < 3.0:
+        alpha = 1.0 - ((diff - 0.5) / 2.5) 
+    else:
+        return
+
+    overlays.fill(0, 0, DISPLAY_SIZE[0], DISPLAY_SIZE[1], (0, 0, 0, alpha))
+
+def draw_victory_screen(final_time):
+    overlays.fill(0, 0, DISPLAY_SIZE[0], DISPLAY_SIZE[1], (0, 0, 0, 0.8))
+    
+    lines = [
+        "MAZE COMPLETED!",
+        f"Total Time: {final_time} seconds",
+        "",
+        "Press [R] to Restart",
+        "Press [G] for New Maze",
+        "Press [ESC] to Quit"
+    ]
+    
+    green = (0, 255, 0, 255)
+    lines = [(line, big_font if i == 0 else game_font, green) if line else None for i, line in enumerate(lines)]
+    overlays.panel("victory", 0, DISPLAY_SIZE[1] // 2 - 160, lines)
+
+def composite_overlays():
+    if not overlays.layers: return
+    set_ortho_projection()
+    overlays.draw()
+    restore_perspective_projection()
+
+def minimap_layout():
+    cell_size = 6
+    map_w = len(maze_map[0]) * cell_size
+    map_h = len(maze_map) * cell_size
+    margin = 20
+    
+    start_x = DISPLAY_SIZE[0] - map_w - margin
+    start_y = DISPLAY_SIZE[1] - map_h - margin
+    return cell_size, map_w, map_h, start_x, start_y
+
+def compile_minimap(px, pz, show_icons):
+    cell_size, map_w, map_h, start_x, start_y = minimap_layout()
+    glDisable(GL_TEXTURE_2D)
+    
+    # Background
+    glColor4f(0.85, 0.75, 0.55, 0.9) 
+    glBegin(GL_QUADS)
+    glVertex2f(start_x - 5, start_y - 5); glVertex2f(start_x + map_w + 5, start_y - 5)
+    glVertex2f(start_x + map_w + 5, start_y + map_h + 5); glVertex2f(start_x - 5, start_y + map_h + 5)
+    glEnd()
+    
+    # Border
+    glColor4f(0.3, 0.2, 0.1, 1.0) 
+    glLineWidth(2)
+    glBegin(GL_LINE_LOOP)
+    glVertex2f(start_x - 5, start_y - 5); glVertex2f(start_x + map_w + 5, start_y - 5)
+    glVertex2f(start_x + map_w + 5, start_y + map_h + 5); glVertex2f(start_x - 5, start_y + map_h + 5)
+    glEnd()
+
+    rows = len(maze_map)
+    cols = len(maze_map[0])
+    
+    # Draw Walls and Start
+    glBegin(GL_QUADS)
+    for r in range(rows):
+        for c in range(cols):
+            cell_type = maze_map[r][c]
+            
+            if cell_type == 1: glColor3f(0.2, 0.2, 0.2) # Walls Dark Grey
+            elif cell_type == 2: glColor3f(0, 0, 1) # Start Blue
+            elif cell_type == 3: glColor3f(0, 1, 0) # End Green
+            else: continue 
+            
+            x = start_x + (c * cell_size)
+            y = start_y + ( (rows - 1 - r) * cell_size ) 
+            glVertex2f(x, y); glVertex2f(x + cell_size, y); glVertex2f(x + cell_size, y + cell_size); glVertex2f(x, y + cell_size)
+    glEnd()
+    
+    # Draw Map Icons
+    if show_icons:
+        # Draw Traps
+        glBegin(GL_QUADS)
+        glColor3f(0.8, 0.4, 0.1)
+        for p in entities.positions(KIND_TRAP).tolist():
+            c = p[0] / 2
+            r = p[1] / 2
+            x = start_x + (c * cell_size)
+            y = start_y + ( (rows - 1 - r) * cell_size )
+            glVertex2f(x, y); glVertex2f(x + cell_size, y); glVertex2f(x + cell_size, y + cell_size); glVertex2f(x, y + cell_size)
+        glEnd()
+
+        # Draw Eyes
+        glBegin(GL_QUADS)
+        glColor3f(0.6, 0, 0)
+        for p in entities.positions(KIND_EYE).tolist():
+            c = p[0] / 2
+            r = p[1] / 2
+            x = start_x + (c * cell_size)
+            y = start_y + ( (rows - 1 - r) * cell_size )
+            glVertex2f(x, y); glVertex2f(x + cell_size, y); glVertex2f(x + cell_size, y + cell_size); glVertex2f(x, y + cell_size)
+        glEnd()
+
+        # Draw Speed Powerups
+        glBegin(GL_QUADS)
+        glColor3f(1, 1, 0)
+        for p in entities.positions(KIND_POWERUP).tolist():
+            c = p[0] / 2
+            r = p[1] / 2
+            x = start_x + (c * cell_size)
+            y = start_y + ( (rows - 1 - r) * cell_size )
+            glVertex2f(x, y); glVertex2f(x + cell_size, y); glVertex2f(x + cell_size, y + cell_size); glVertex2f(x, y + cell_size)
+        glEnd()
+
+        # Draw Launch Pyramids
+        glBegin(GL_QUADS)
+        glColor3f(0.6, 0, 0.8)
+        for p in entities.positions(KIND_PYRAMID).tolist():
+            c = p[0] / 2
+            r = p[1] / 2
+            x = start_x + (c * cell_size)
+            y = start_y + ( (rows - 1 - r) * cell_size )
+            glVertex2f(x, y); glVertex2f(x + cell_size, y); glVertex2f(x + cell_size, y + cell_size); glVertex2f(x, y + cell_size)
+        glEnd()
+    
+    # Player Dot
+    player_grid_x = px / 2
+    player_grid_z = pz / 2
+    p_x = start_x + (player_grid_x * cell_size)
+    p_y = start_y + ((rows - 1 - player_grid_z) * cell_size)
+    
+    glColor3f(1.0, 0, 0) 
+    glBegin(GL_QUADS)
+    glVertex2f(p_x - 1, p_y - 1); glVertex2f(p_x + cell_size + 1, p_y - 1)
+    glVertex2f(p_x + cell_size + 1, p_y + cell_size + 1); glVertex2f(p_x - 1, p_y + cell_size + 1)
+    glEnd()
+
+def draw_minimap(px, pz, show_icons):
+    # The map itself is recompiled at the quality level's refresh interval;
+    # with no interval it is drawn straight out every frame
+    global minimap_list, minimap_built_at, minimap_icons
+    if quality.minimap_interval <= 0:
+        if minimap_list is not None:
+            resources.free(DISPLAY_LIST, minimap_list)
+            minimap_list = None
+        set_ortho_projection()
+        compile_minimap(px, pz, show_icons)
+    else:
+        now = time.time()
+        if minimap_list is None or show_icons != minimap_icons or now - minimap_built_at >= quality.minimap_interval:
+            if minimap_list is not None:
+                resources.free(DISPLAY_LIST, minimap_list)
+            minimap_list = resources.display_list(SCOPE_LEVEL, len(maze_map) * len(maze_map[0]) * 48)
+            glNewList(minimap_list, GL_COMPILE)
+            compile_minimap(px, pz, show_icons)
+            glEndList()
+            minimap_built_at = now
+            minimap_icons = show_icons
+        set_ortho_projection()
+        glCallList(minimap_list)
+    cell_size, map_w, map_h, start_x, start_y = minimap_layout()
+    
+    # Toggle Info Text
+    glEnable(GL_TEXTURE_2D)
+    glColor3f(1, 1, 1)
+    tex_id, w, h = load_text_texture(game_font, "[X] Toggle Icons", (255, 255, 255, 255))
+    x_pos = start_x + (map_w / 2) - (w / 2)
+    y_pos = start_y - h - 5
+    draw_textured_quad(x_pos, y_pos, w, h)
+    resources.free(TEXTURE, tex_id)
+
+    restore_perspective_projection()
@@ -0,0 +1,256 @@
+import math
+import queue
+import threading
+import time
+from collections import namedtuple
+from entities import KIND_EYE, KIND_TRAP, KIND_POWERUP, KIND_PYRAMID
+from maze import generate_maze, populate_entities, get_random_spawn, exit_position
+from visibility import build_pvs
+
+MAZE_WIDTH = 12
+MAZE_HEIGHT = 12
+MOVE_SPEED = 0.1
+TURN_SPEED = 2.0
+
+# Game logic runs at a fixed rate; speeds above are per tick
+TICK_RATE = 60
+TICK = 1.0 / TICK_RATE
+MAX_CATCH_UP = 5 # ticks; after a longer stall the clock jumps instead
+
+# Commands queued from the input side
+RESET = "reset"
+NEW_MAZE = "new_maze"
+TOGGLE_SLOW_WALK = "toggle_slow_walk"
+
+Inputs = namedtuple("Inputs", "forward back left right")
+NO_INPUT = Inputs(False, False, False, False)
+
+# Everything the renderer needs for one tick. Never mutated once published.
+Snapshot = namedtuple("Snapshot", [
+    "tick", "published_at", "level", "maze_map", "entities",
+    "player_x", "player_z", "player_yaw", "cam_y",
+    "elapsed", "game_over", "final_time",
+    "blindness_active", "blindness_elapsed", "launch_active", "slow_walk_active",
+    "pvs",
+])
+
+def build_level(width, height, visibility=False):
+    # Everything a new maze needs, without touching a GameState, so it can
+    # be built on another thread and swapped in with load_level
+    maze_map = generate_maze(width, height)
+    return maze_map, populate_entities(maze_map), build_pvs(maze_map) if visibility else None
+
+class GameState:
+    def __init__(self, width=MAZE_WIDTH, height=MAZE_HEIGHT, visibility=False):
+        self.width = width
+        self.height = height
+        self.visibility = visibility # build the PVS with each maze, for a renderer
+        self.clock = 0.0 # simulated seconds
+        self.tick = 0
+        self.level = 0
+        self._entity_view = None
+        self._entity_view_key = None
+        self.new_maze()
+
+    def new_maze(self):
+        # The PVS is built here so a maze swap never stalls the render thread
+        self.load_level(build_level(self.width, self.height, self.visibility))
+
+    def load_level(self, level):
+        self.maze_map, self.entities, self.pvs = level
+        self.level += 1
+        self.reset()
+
+    def reset(self):
+        self.player_x = 2
+        self.player_z = 2
+        self.player_yaw = 90
+        self.cam_y = 0.0
+        self.start_time = self.clock
+        self.final_time = 0
+        self.game_over = False
+        self.blindness_active = False
+        self.blindness_start_time = 0
+        self.speed_boost_active = False
+        self.speed_boost_end_time = 0
+        self.launch_active = False
+        self.launch_start_time = 0
+        self.slow_walk_active = False
+
+    def apply(self, command):
+        if command == RESET:
+            self.reset()
+        elif command == NEW_MAZE:
+            self.new_maze()
+        elif command == TOGGLE_SLOW_WALK:
+            self.slow_walk_active = not self.slow_walk_active
+
+    @property
+    def elapsed(self):
+        return self.final_time if self.game_over else int(self.clock - self.start_time)
+
+    def step(self, inputs):
+        self.clock += TICK
+        self.tick += 1
+        now = self.clock
+        maze_map = self.maze_map
+        entities = self.entities
+
+        # Movement
+        if not self.game_over and not self.launch_active:
+            if inputs.left: self.player_yaw -= TURN_SPEED
+            if inputs.right: self.player_yaw += TURN_SPEED
+            player_x, player_z = self.player_x, self.player_z
+
+            # Check Powerup Collision
+            for i in entities.within(KIND_POWERUP, player_x, player_z, 0.5):
+                entities.remove(i)
+                self.speed_boost_active = True
+                self.speed_boost_end_time = now + 2
+
+            # Check Pyramid Collision
+            for i in entities.within(KIND_PYRAMID, player_x, player_z, 0.5):
+                entities.remove(i)
+                self.launch_active = True
+                self.launch_start_time = now
+
+            current_speed = MOVE_SPEED
+
+            # Apply modifiers
+            if self.speed_boost_active:
+                current_speed = MOVE_SPEED * 2.0
+                if now > self.speed_boost_end_time:
+                    self.speed_boost_active = False
+            else:
+                grid_x = int(round(player_x / 2))
+                grid_z = int(round(player_z / 2))
+                if entities.at_cell(KIND_TRAP, grid_z, grid_x):
+                    current_speed = MOVE_SPEED * 0.3
+
+            # Apply Slow Walk
+            if self.slow_walk_active:
+                current_speed *= 0.5
+
+            dx = math.sin(math.radians(self.player_yaw)) * current_speed
+            dz = -math.cos(math.radians(self.player_yaw)) * current_speed
+            buffer = 0.25
+
+            if inputs.forward:
+                next_x = player_x + dx; next_z = player_z + dz
+                check_x = next_x + math.copysign(buffer, dx); check_z = next_z + math.copysign(buffer, dz)
+                if maze_map[int(round(check_z/2))][int(round(check_x/2))] != 1:
+                    player_x = next_x; player_z = next_z
+
+            if inputs.back:
+                next_x = player_x - dx; next_z = player_z - dz
+                check_x = next_x - math.copysign(buffer, dx); check_z = next_z - math.copysign(buffer, dz)
+                if maze_map[int(round(check_z/2))][int(round(check_x/2))] != 1:
+                    player_x = next_x; player_z = next_z
+
+            # Teleport
+            if len(entities.within(KIND_EYE, player_x, player_z, 0.5)) and not self.blindness_active:
+                self.blindness_active = True
+                self.blindness_start_time = now
+                player_x, player_z = get_random_spawn(maze_map)
+
+            self.player_x, self.player_z = player_x, player_z
+
+        self.cam_y = 0.0
+        if self.launch_active:
+            # Launch: 4 seconds
+            t = now - self.launch_start_time
+            if t < 0.5:
+                self.cam_y = (t / 0.5) * 20.0
+            elif t < 3.5:
+                self.cam_y = 20.0
+            elif t < 4.0:
+                self.cam_y = 20.0 - ((t - 3.5) / 0.5) * 20.0
+            else:
+                self.launch_active = False
+
+        if self.blindness_active and now - self.blindness_start_time >= 3.0:
+            self.blindness_active = False
+
+        # Diamond Collision
+        dia_x, dia_z = exit_position(maze_map)
+        dist_to_diamond = math.sqrt((self.player_x - dia_x)**2 + (self.player_z - dia_z)**2)
+        if dist_to_diamond < 0.5 and not self.game_over:
+            self.final_time = self.elapsed
+            self.game_over = True
+
+    def snapshot(self, published_at):
+        # Entities are only copied when a pickup or a new maze changed them
+        key = (self.level, self.entities.version)
+        if key != self._entity_view_key:
+            self._entity_view = self.entities.copy()
+            self._entity_view_key = key
+        return Snapshot(
+            self.tick, published_at, self.level, self.maze_map, self._entity_view,
+            self.player_x, self.player_z, self.player_yaw, self.cam_y,
+            self.elapsed, self.game_over, self.final_time,
+            self.blindness_active, self.clock - self.blindness_start_time,
+            self.launch_active, self.slow_walk_active,
+            self.pvs,
+        )
+
+class SnapshotBuffer:
+    # Double buffer of the two most recent snapshots. Publishing swaps
+    # references under the lock, so a reader always gets a consistent pair.
+    def __init__(self, first):
+        self._lock = threading.Lock()
+        self.previous = first
+        self.current = first
+
+    def publish(self, snapshot):
+        with self._lock:
+            self.previous, self.current = self.current, snapshot
+
+    def read(self):
+        with self._lock:
+            return self.previous, self.current
+
+def interpolate(previous, current, now):
+    # Render one tick behind the simulation, blending the last two ticks.
+    # Teleports and maze swaps snap instead of sliding across the map.
+    jumped = (current.player_x - previous.player_x)**2 + (current.player_z - previous.player_z)**2 > 1.0
+    if previous.level != current.level or jumped:
+        return current.player_x, current.player_z, current.player_yaw, current.cam_y
+    alpha = min(max((now - current.published_at) / TICK, 0.0), 1.0)
+    return (previous.player_x + (current.player_x - previous.player_x) * alpha,
+            previous.player_z + (current.player_z - previous.player_z) * alpha,
+            previous.player_yaw + (current.player_yaw - previous.player_yaw) * alpha,
+            previous.cam_y + (current.cam_y - previous.cam_y) * alpha)
+
+class SimulationThread(threading.Thread):
+    def __init__(self, state, buffer):
+        super().__init__(name="simulation", daemon=True)
+        self.state = state
+        self.buffer = buffer
+        self.inputs = NO_INPUT # replaced wholesale by the input thread
+        self.commands = queue.SimpleQueue()
+        self._stop_event = threading.Event()
+
+    def set_inputs(self, inputs):
+        self.inputs = inputs
+
+    def send(self, command):
+        self.commands.put(command)
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+    def run(self):
+        next_tick = time.perf_counter()
+        while not self._stop_event.is_set():
+            now = time.perf_counter()
+            if now < next_tick:
+                self._stop_event.wait(next_tick - now)
+                continue
+            if now - next_tick > MAX_CATCH_UP * TICK:
+                next_tick = now
+            while not self.commands.empty():
+                self.state.apply(self.commands.get_nowait())
+            self.state.step(self.inputs)
+            self.buffer.publish(self.state.snapshot(next_tick))
+            next_tick += TICK
@@ -0,0 +1,19 @@
+import random
+import numpy as np
+from difficulty_sim import CELL_SECONDS, POLICIES, build_batch, simulate
+from maze_grid import WALL, EXIT, distance_field
+
+def test_shortest_agent_takes_the_bfs_path_on_an_empty_maze():
+    random.seed(2)
+    grid, eyes, traps, powerups, pyramids = build_batch(4, 5, 5, (0.0, 0.0, 0.0, 0.0))
+    assert not (eyes.any() or traps.any() or powerups.any() or pyramids.any())
+    times = simulate(grid, eyes, traps, powerups, pyramids, 2, 1000, np.random.default_rng(0))
+    assert set(times) == set(POLICIES)
+
+    path = distance_field(grid != WALL, grid == EXIT)[:, 1, 1]
+    expected = np.repeat(path * CELL_SECONDS, 2)
+    assert np.allclose(times["shortest"], expected)
+    # Every other policy needs at least as long
+    for name in POLICIES:
+        finished = ~np.isnan(times[name])
+        assert np.all(times[name][finished] >= np.repeat(path * CELL_SECONDS, 2)[finished] - 1e-9)
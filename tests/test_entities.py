@@ -0,0 +1,43 @@
+from entities import EntityStore, KIND_EYE, KIND_TRAP
+
+def test_add_and_query():
+    store = EntityStore(capacity=2)
+    store.add(KIND_EYE, 2, 4)
+    store.extend(KIND_TRAP, [(6, 8), (10, 12)])
+    assert len(store) == 3
+    assert store.positions(KIND_TRAP).tolist() == [[6, 8], [10, 12]]
+    assert store.at_cell(KIND_EYE, 2, 1)
+    assert store.within(KIND_TRAP, 6, 9, 1.5).tolist() == [1]
+
+def test_remove_keeps_slots_until_compaction():
+    store = EntityStore()
+    store.extend(KIND_TRAP, [(0, 0), (2, 2), (4, 4)])
+    version = store.version
+    store.remove(1)
+    assert store.version > version
+    assert len(store) == 2
+    assert store.count == 3
+    assert store.positions(KIND_TRAP).tolist() == [[0, 0], [4, 4]]
+
+    version = store.version
+    store.remove(1)
+    assert store.version == version
+
+def test_add_compacts_dead_slots():
+    store = EntityStore()
+    store.extend(KIND_TRAP, [(0, 0), (2, 2), (4, 4), (6, 6)])
+    store.remove(0)
+    store.remove(2)
+    store.add(KIND_EYE, 8, 8)
+    assert store.count == 3
+    assert store.dead == 0
+    assert store.positions(KIND_TRAP).tolist() == [[2, 2], [6, 6]]
+    assert store.positions(KIND_EYE).tolist() == [[8, 8]]
+
+def test_copy_is_independent():
+    store = EntityStore()
+    store.extend(KIND_EYE, [(0, 0), (2, 2)])
+    other = store.copy()
+    store.remove(0)
+    assert len(other) == 2
+    assert other.version != store.version
@@ -0,0 +1,79 @@
+import asyncio
+import json
+import random
+from entities import KIND_TRAP
+from game_server import GameServer, Session
+from simulation import GameState, NEW_MAZE, TOGGLE_SLOW_WALK
+
+def decode(data):
+    return [json.loads(line) for line in data.decode().splitlines()]
+
+def make_session():
+    random.seed(5)
+    return Session(1, None, GameState(4, 4), timing=False)
+
+def test_first_delta_sends_level_and_every_field():
+    session = make_session()
+    level, delta = decode(session.delta(0.0))
+    assert level["op"] == "level"
+    assert level["maze"] == session.state.maze_map
+    assert len(level["ents"]) == len(session.state.entities)
+    assert delta["op"] == "d"
+    assert {"x", "z", "yaw", "cy", "el", "go", "ft", "bl", "la", "sw"} <= delta.keys()
+
+def test_delta_sends_only_changes():
+    session = make_session()
+    session.delta(0.0)
+    assert session.delta(0.0) is None
+
+    session.state.player_x += 0.5
+    (delta,) = decode(session.delta(0.0))
+    assert delta == {"x": round(session.state.player_x, 3), "op": "d", "t": session.state.tick}
+
+def test_delta_reports_removed_entities():
+    session = make_session()
+    store = session.state.entities
+    store.add(KIND_TRAP, 2, 2)
+    session.delta(0.0)
+    store.remove(store.count - 1)
+    (delta,) = decode(session.delta(0.0))
+    assert delta["rm"] == [store.count - 1]
+
+def test_delta_resends_level_on_new_maze():
+    session = make_session()
+    session.delta(0.0)
+    session.state.new_maze()
+    messages = decode(session.delta(0.0))
+    assert messages[0]["op"] == "level"
+    assert messages[0]["level"] == session.state.level
+
+def test_repeated_new_maze_builds_one_level():
+    async def scenario():
+        session = make_session()
+        level = session.state.level
+        for _ in range(50):
+            session.queue_command(NEW_MAZE)
+        session.queue_command(TOGGLE_SLOW_WALK)
+        await session.building
+        session.apply_commands()
+        return session, level
+
+    session, level = asyncio.run(scenario())
+    assert session.state.level == level + 1
+    assert session.state.slow_walk_active
+    assert not session.commands and session.building is None
+
+def test_join_rejects_bad_sizes():
+    async def scenario():
+        server = GameServer()
+        port = await server.start("127.0.0.1", 0)
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        replies = []
+        for join in ('{"op":"join","width":1e999}', '{"op":"join","width":"abc"}', '{"op":"join","height":2}'):
+            writer.write(join.encode() + b"\n")
+            replies.append(json.loads(await reader.readline()))
+        writer.close()
+        await server.close()
+        return replies
+
+    assert [reply["op"] for reply in asyncio.run(scenario())] == ["error"] * 3
@@ -0,0 +1,47 @@
+from lighting import WALL_ALBEDO, PLAYER_LIGHT_SIZE, bake_walls, bake_stats, player_light_texels
+
+ROOM = [
+    [1, 1, 1, 1, 1, 1, 1],
+    [1, 0, 0, 0, 0, 0, 1],
+    [1, 0, 0, 0, 0, 0, 1],
+    [1, 0, 0, 1, 1, 0, 1],
+    [1, 0, 0, 0, 0, 0, 1],
+    [1, 0, 0, 0, 0, 0, 1],
+    [1, 1, 1, 1, 1, 1, 1],
+]
+
+def top_colours(face):
+    return [vertex[5:] for vertex in face if vertex[1] > 0]
+
+def test_faces_against_walls_are_culled():
+    baked = bake_walls(ROOM, lights=[])
+    # Four sides and a top, less the side against the other pillar half
+    assert len(baked[(3, 3)]) == 4
+    assert len(baked[(3, 4)]) == 4
+    # Corner walls only show their top
+    assert len(baked[(0, 0)]) == 1
+    assert bake_stats(baked)["vertices"] == 4 * bake_stats(baked)["faces"]
+
+def test_occlusion_darker_in_corners_than_in_the_open():
+    baked = bake_walls(ROOM, lights=[])
+    # The pillar's west face looks into open floor
+    pillar = min(baked[(3, 3)], key=lambda face: sum(v[0] for v in face))
+    assert all(colour == WALL_ALBEDO for colour in top_colours(pillar))
+    # The north wall's face above the room's corner cell meets the west wall
+    corner = max(baked[(0, 1)], key=lambda face: sum(v[2] for v in face))
+    assert min(sum(colour) for colour in top_colours(corner)) < sum(WALL_ALBEDO)
+
+def test_static_lights_brighten_the_bake():
+    unlit = bake_walls(ROOM, lights=[])
+    lit = bake_walls(ROOM, lights=[(4.0, 0.5, 4.0, (1.0, 1.0, 1.0), 6.0)])
+    before = sum(v[5] for face in unlit[(3, 3)] for v in face)
+    after = sum(v[5] for face in lit[(3, 3)] for v in face)
+    assert after > before
+
+def test_player_light_texels():
+    size = PLAYER_LIGHT_SIZE
+    data = player_light_texels()
+    assert len(data) == size * size * 3
+    centre = (size // 2 * size + size // 2) * 3
+    assert all(b > 128 for b in data[centre:centre + 3])
+    assert data[:3] == bytes((128, 128, 128))
@@ -0,0 +1,35 @@
+import numpy as np
+from maze import generate_maze
+from maze_grid import WALL, maze_to_array, open_neighbour_count
+from maze_analytics import CORRIDOR_BINS, RunningSummary, chunk_metrics, corridor_lengths
+
+def test_corridor_lengths():
+    # A corridor of 3 from the left dead end to the junction, one of 2
+    # from the junction down to the bottom dead end
+    grid = maze_to_array([
+        [1, 1, 1, 1, 1, 1, 1, 1],
+        [1, 0, 0, 0, 0, 0, 0, 1],
+        [1, 1, 1, 1, 1, 0, 1, 1],
+        [1, 1, 1, 1, 1, 0, 1, 1],
+        [1, 1, 1, 1, 1, 0, 1, 1],
+        [1, 1, 1, 1, 1, 1, 1, 1],
+    ])[None]
+    open_mask = grid != WALL
+    hist, longest = corridor_lengths(open_mask, open_neighbour_count(open_mask))
+    expected = np.zeros(CORRIDOR_BINS, dtype=np.int32)
+    expected[[1, 2]] = 1
+    assert hist[0].tolist() == expected.tolist()
+    assert longest.tolist() == [3]
+
+def test_summary_skips_missing_trap_data(capsys):
+    summary = RunningSummary()
+    for traps in (None, None):
+        grid = maze_to_array([generate_maze(4, 4) for _ in range(3)])
+        columns = chunk_metrics(grid, traps)
+        columns["index"] = np.arange(3)
+        summary.add(columns)
+    summary.print()
+    out = capsys.readouterr().out
+    assert "trap_share        n/a" in out
+    assert "-inf" not in out
+    assert summary.counts["dead_ends"] == 6
@@ -0,0 +1,37 @@
+import random
+from collections import deque
+import numpy as np
+from maze import generate_maze
+from maze_grid import WALL, EXIT, maze_to_array, distance_field
+
+def bfs(maze, targets):
+    rows, cols = len(maze), len(maze[0])
+    dist = [[-1] * cols for _ in range(rows)]
+    queue = deque(targets)
+    for r, c in targets:
+        dist[r][c] = 0
+    while queue:
+        r, c = queue.popleft()
+        for nr, nc in ((r - 1, c), (r + 1, c), (r, c - 1), (r, c + 1)):
+            if 0 <= nr < rows and 0 <= nc < cols and maze[nr][nc] != WALL and dist[nr][nc] < 0:
+                dist[nr][nc] = dist[r][c] + 1
+                queue.append((nr, nc))
+    return dist
+
+def test_distance_field_matches_bfs():
+    random.seed(11)
+    mazes = [generate_maze(7, 5) for _ in range(3)]
+    grid = np.stack([maze_to_array(m) for m in mazes])
+    dist = distance_field(grid != WALL, grid == EXIT)
+    for i, maze in enumerate(mazes):
+        exits = [(r, c) for r, row in enumerate(maze) for c, cell in enumerate(row) if cell == EXIT]
+        assert dist[i].tolist() == bfs(maze, exits)
+
+def test_distance_field_unreachable():
+    grid = maze_to_array([
+        [0, 1, 0],
+        [0, 1, 0],
+    ])
+    targets = np.zeros(grid.shape, dtype=np.bool_)
+    targets[0, 0] = True
+    assert distance_field(grid != WALL, targets).tolist() == [[0, -1, -1], [1, -1, -1]]
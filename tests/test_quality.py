@@ -0,0 +1,36 @@
+from quality import LEVELS, QualityGovernor
+
+SLOW = 0.05 # well over the 60 fps budget
+FAST = 0.001
+
+def make_governor(**kwargs):
+    # No smoothing, so each frame time is the average
+    return QualityGovernor(60, smoothing=1.0, **kwargs)
+
+def test_drops_quality_over_budget():
+    changes = []
+    governor = make_governor(on_change=lambda decision, settings: changes.append((decision, settings)))
+    assert governor.frame(SLOW, 0.0) == LEVELS[1]
+    assert len(changes) == 1
+    decision, settings = changes[0]
+    assert (decision.old_level, decision.new_level) == (0, 1)
+    assert settings == LEVELS[1]
+
+def test_cooldown_between_changes():
+    governor = make_governor()
+    governor.frame(SLOW, 0.0)
+    assert governor.frame(SLOW, 0.5) == LEVELS[1]
+    assert governor.frame(SLOW, 1.1) == LEVELS[2]
+
+def test_raises_quality_only_with_headroom():
+    governor = make_governor(level=2)
+    # Under budget but not by enough
+    assert governor.frame(0.9 / 60, 0.0) == LEVELS[2]
+    assert governor.frame(FAST, 0.1) == LEVELS[1]
+    assert governor.frame(FAST, 1.2) == LEVELS[0]
+    assert governor.frame(FAST, 2.4) == LEVELS[0]
+    assert [d.new_level for d in governor.decisions] == [1, 0]
+
+def test_stays_within_levels():
+    governor = make_governor(level=len(LEVELS) - 1)
+    assert governor.frame(SLOW, 0.0) == LEVELS[-1]
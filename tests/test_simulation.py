@@ -0,0 +1,84 @@
+import random
+import pytest
+from entities import KIND_EYE, KIND_POWERUP, KIND_PYRAMID
+from simulation import GameState, SnapshotBuffer, NO_INPUT, TICK, TICK_RATE, interpolate
+
+def make_state():
+    random.seed(9)
+    state = GameState(4, 4)
+    state.entities.clear()
+    return state
+
+def run(state, seconds):
+    for _ in range(int(seconds * TICK_RATE)):
+        state.step(NO_INPUT)
+
+def test_interpolate_blends_and_clamps():
+    state = make_state()
+    previous = state.snapshot(0.0)
+    state.player_x += 0.5
+    state.player_yaw += 10
+    current = state.snapshot(1.0)
+
+    assert interpolate(previous, current, 1.0 + TICK / 2)[:3] == pytest.approx((2.25, 2, 95))
+    assert interpolate(previous, current, 0.5)[:3] == (2, 2, 90)
+    assert interpolate(previous, current, 5.0)[:3] == (2.5, 2, 100)
+
+def test_interpolate_snaps_on_teleport_and_level_change():
+    state = make_state()
+    previous = state.snapshot(0.0)
+    state.player_x += 4
+    teleported = state.snapshot(1.0)
+    assert interpolate(previous, teleported, 1.0)[0] == state.player_x
+
+    state.player_x -= 4
+    state.player_z += 0.5
+    swapped = state.snapshot(1.0)._replace(level=previous.level + 1)
+    assert interpolate(previous, swapped, 1.0)[1] == state.player_z
+
+def test_snapshot_buffer_keeps_the_last_two():
+    state = make_state()
+    first, second, third = (state.snapshot(t) for t in (0.0, 1.0, 2.0))
+    buffer = SnapshotBuffer(first)
+    assert buffer.read() == (first, first)
+    buffer.publish(second)
+    buffer.publish(third)
+    assert buffer.read() == (second, third)
+
+def test_snapshot_copies_entities_only_when_they_change():
+    state = make_state()
+    first = state.snapshot(0.0)
+    assert state.snapshot(1.0).entities is first.entities
+    state.entities.add(KIND_EYE, 6, 6)
+    assert state.snapshot(2.0).entities is not first.entities
+
+def test_powerup_boost_expires():
+    state = make_state()
+    state.entities.add(KIND_POWERUP, 2, 2)
+    state.step(NO_INPUT)
+    assert state.speed_boost_active
+    assert len(state.entities) == 0
+    run(state, 2.1)
+    assert not state.speed_boost_active
+
+def test_launch_lifts_the_camera_for_four_seconds():
+    state = make_state()
+    state.entities.add(KIND_PYRAMID, 2, 2)
+    state.step(NO_INPUT)
+    assert state.launch_active
+    run(state, 1.0)
+    assert state.cam_y == 20.0
+    run(state, 3.1)
+    assert not state.launch_active
+    assert state.cam_y == 0.0
+
+def test_eye_teleports_and_blindness_expires():
+    state = make_state()
+    state.entities.add(KIND_EYE, 2, 2)
+    state.step(NO_INPUT)
+    assert state.blindness_active
+    assert (state.player_x, state.player_z) != (2, 2)
+    run(state, 2.9)
+    assert state.blindness_active
+    run(state, 0.2)
+    assert not state.blindness_active
@@ -0,0 +1,91 @@
+import math
+import random
+from maze import generate_maze
+from visibility import CELL_SIZE, PVS_RANGE, has_line_of_sight, build_pvs, world_to_cell
+
+ROOM = [
+    [1, 1, 1, 1, 1, 1, 1],
+    [1, 0, 0, 0, 0, 0, 1],
+    [1, 0, 0, 0, 0, 0, 1],
+    [1, 0, 0, 0, 0, 0, 1],
+    [1, 1, 1, 1, 1, 1, 1],
+]
+
+SPLIT = [
+    [1, 1, 1, 1, 1, 1, 1],
+    [1, 0, 0, 1, 0, 0, 1],
+    [1, 0, 0, 1, 0, 0, 1],
+    [1, 0, 0, 1, 0, 0, 1],
+    [1, 1, 1, 1, 1, 1, 1],
+]
+
+def sampled_line_of_sight(maze, x0, z0, x1, z1, steps=4000):
+    for i in range(steps + 1):
+        t = i / steps
+        r, c = world_to_cell(x0 + (x1 - x0) * t, z0 + (z1 - z0) * t)
+        if not (0 <= r < len(maze) and 0 <= c < len(maze[0])) or maze[r][c] == 1:
+            return False
+    return True
+
+def test_line_of_sight_in_open_room():
+    assert has_line_of_sight(ROOM, 2, 2, 10, 6)
+    assert has_line_of_sight(ROOM, 10, 6, 2, 2)
+
+def test_line_of_sight_blocked_by_wall():
+    assert not has_line_of_sight(SPLIT, 2, 4, 10, 4)
+    assert has_line_of_sight(SPLIT, 2, 2, 4, 6)
+
+def test_line_of_sight_outside_the_grid():
+    assert not has_line_of_sight(ROOM, 2, 2, -4, 2)
+
+def test_line_of_sight_matches_sampling():
+    random.seed(7)
+    maze = generate_maze(6, 6)
+    open_cells = [(r, c) for r in range(len(maze)) for c in range(len(maze[0])) if maze[r][c] != 1]
+    for _ in range(300):
+        (r0, c0), (r1, c1) = random.sample(open_cells, 2)
+        x0, z0 = c0 * CELL_SIZE + random.uniform(-0.9, 0.9), r0 * CELL_SIZE + random.uniform(-0.9, 0.9)
+        x1, z1 = c1 * CELL_SIZE + random.uniform(-0.9, 0.9), r1 * CELL_SIZE + random.uniform(-0.9, 0.9)
+        assert has_line_of_sight(maze, x0, z0, x1, z1) == sampled_line_of_sight(maze, x0, z0, x1, z1)
+
+def test_pvs_walls_have_no_set():
+    pvs = build_pvs(SPLIT)
+    cols = len(SPLIT[0])
+    for r, row in enumerate(SPLIT):
+        for c, cell in enumerate(row):
+            assert (pvs[r * cols + c] is None) == (cell == 1)
+
+def test_pvs_open_room_sees_everything():
+    pvs = build_pvs(ROOM)
+    cols = len(ROOM[0])
+    # The surrounding walls are reached as well, bar the four corners
+    # which only ever touch other walls
+    last = len(ROOM) * cols - 1
+    expected = set(range(last + 1)) - {0, cols - 1, last - cols + 1, last}
+    for r, row in enumerate(ROOM):
+        for c, cell in enumerate(row):
+            if cell == 1: continue
+            assert set(pvs[r * cols + c]) == expected
+
+def test_pvs_stops_at_walls():
+    pvs = build_pvs(SPLIT)
+    cols = len(SPLIT[0])
+    for r in range(1, 4):
+        left = set(pvs[r * cols + 1])
+        assert r * cols + 3 in left
+        assert not any(i % cols > 3 for i in left)
+
+def test_pvs_contains_cells_in_sight():
+    random.seed(3)
+    maze = generate_maze(6, 6)
+    pvs = build_pvs(maze)
+    cols = len(maze[0])
+    open_cells = [(r, c) for r in range(len(maze)) for c in range(cols) if maze[r][c] != 1]
+    for r0, c0 in open_cells:
+        visible = set(pvs[r0 * cols + c0])
+        assert r0 * cols + c0 in visible
+        for r1, c1 in open_cells:
+            x0, z0, x1, z1 = c0 * CELL_SIZE, r0 * CELL_SIZE, c1 * CELL_SIZE, r1 * CELL_SIZE
+            if math.hypot(x1 - x0, z1 - z0) > PVS_RANGE - CELL_SIZE: continue
+            if has_line_of_sight(maze, x0, z0, x1, z1):
+                assert r1 * cols + c1 in visible
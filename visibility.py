@@ -0,0 +1,152 @@
+import math
+import sys
+from array import array
+import numpy as np
+
+# World space: cell (r, c) is centred on (c * 2, r * 2) and spans +/-1 on
+# both axes. Grid space divides by the cell size and shifts by half a cell
+# so that cell (r, c) covers [c, c+1) x [r, r+1).
+CELL_SIZE = 2.0
+PVS_RAYS = 256
+PVS_RANGE = 16.0 # world units, just past the fog end
+PVS_SAMPLE_INSET = 0.1
+PVS_BATCH = 64 # origin cells whose rays are walked together
+
+def world_to_cell(x, z):
+    return int(round(z / CELL_SIZE)), int(round(x / CELL_SIZE))
+
+def _to_grid(v):
+    return v / CELL_SIZE + 0.5
+
+def has_line_of_sight(maze, x0, z0, x1, z1):
+    # DDA walk over every cell the segment touches, stopping at the first wall
+    u0, v0 = _to_grid(x0), _to_grid(z0)
+    u1, v1 = _to_grid(x1), _to_grid(z1)
+    c, r = int(math.floor(u0)), int(math.floor(v0))
+    end_c, end_r = int(math.floor(u1)), int(math.floor(v1))
+    du, dv = u1 - u0, v1 - v0
+    rows, cols = len(maze), len(maze[0])
+
+    if du > 0:
+        step_c, t_delta_c = 1, 1.0 / du
+        t_max_c = (c + 1 - u0) * t_delta_c
+    elif du < 0:
+        step_c, t_delta_c = -1, -1.0 / du
+        t_max_c = (u0 - c) * t_delta_c
+    else:
+        step_c, t_delta_c, t_max_c = 0, math.inf, math.inf
+
+    if dv > 0:
+        step_r, t_delta_r = 1, 1.0 / dv
+        t_max_r = (r + 1 - v0) * t_delta_r
+    elif dv < 0:
+        step_r, t_delta_r = -1, -1.0 / dv
+        t_max_r = (v0 - r) * t_delta_r
+    else:
+        step_r, t_delta_r, t_max_r = 0, math.inf, math.inf
+
+    while True:
+        if not (0 <= r < rows and 0 <= c < cols): return False
+        if maze[r][c] == 1: return False
+        if r == end_r and c == end_c: return True
+        if t_max_c < t_max_r:
+            if t_max_c > 1.0: return True
+            c += step_c
+            t_max_c += t_delta_c
+        else:
+            if t_max_r > 1.0: return True
+            r += step_r
+            t_max_r += t_delta_r
+
+def _mark_rays(walls, rows, cols, cells, samples, directions, max_t, seen):
+    # The same DDA as has_line_of_sight over every ray fanned out of the
+    # given cells at once, one grid crossing per pass over the rays still
+    # running. Each cell entered is marked, up to and including the first
+    # wall; seen[i] collects the cells reached from cells[i].
+    per_cell = len(samples) * len(directions)
+    origin = np.repeat(np.arange(len(cells)), per_cell)
+    start_r, start_c = np.divmod(cells[origin], cols)
+    sample = np.tile(np.repeat(samples, len(directions), axis=0), (len(cells), 1))
+    direction = np.tile(directions, (len(cells) * len(samples), 1))
+    u0 = start_c + sample[:, 0]
+    v0 = start_r + sample[:, 1]
+    du, dv = direction[:, 0], direction[:, 1]
+    c, r = start_c, start_r
+
+    with np.errstate(divide="ignore"):
+        t_delta_c = np.where(du != 0, 1.0 / np.abs(du), np.inf)
+        t_delta_r = np.where(dv != 0, 1.0 / np.abs(dv), np.inf)
+    step_c = np.sign(du).astype(np.int64)
+    step_r = np.sign(dv).astype(np.int64)
+    t_max_c = np.where(du > 0, (c + 1 - u0) * t_delta_c, np.where(du < 0, (u0 - c) * t_delta_c, np.inf))
+    t_max_r = np.where(dv > 0, (r + 1 - v0) * t_delta_r, np.where(dv < 0, (v0 - r) * t_delta_r, np.inf))
+
+    while len(origin):
+        cell = r * cols + c
+        seen[origin, cell] = True
+        along_c = t_max_c < t_max_r
+        t_next = np.where(along_c, t_max_c, t_max_r)
+        c = c + np.where(along_c, step_c, 0)
+        r = r + np.where(along_c, 0, step_r)
+        t_max_c = np.where(along_c, t_max_c + t_delta_c, t_max_c)
+        t_max_r = np.where(along_c, t_max_r, t_max_r + t_delta_r)
+        keep = ~walls[cell] & (t_next <= max_t) & (r >= 0) & (r < rows) & (c >= 0) & (c < cols)
+        origin, r, c = origin[keep], r[keep], c[keep]
+        t_max_c, t_max_r = t_max_c[keep], t_max_r[keep]
+        t_delta_c, t_delta_r = t_delta_c[keep], t_delta_r[keep]
+        step_c, step_r = step_c[keep], step_r[keep]
+
+def build_pvs(maze, rays=PVS_RAYS, max_dist=PVS_RANGE):
+    # Potentially visible set per open cell, as a sorted array of cell
+    # indices (r * cols + c). Rays are fanned out from the centre and four
+    # inset corners of each cell, so anything visible from a point inside
+    # the cell is picked up by at least one sample in practice. Wall cells
+    # get None.
+    rows, cols = len(maze), len(maze[0])
+    walls = np.array(maze).reshape(-1) == 1
+    max_t = max_dist / CELL_SIZE
+    lo, hi = PVS_SAMPLE_INSET, 1.0 - PVS_SAMPLE_INSET
+    samples = np.array(((0.5, 0.5), (lo, lo), (hi, lo), (lo, hi), (hi, hi)))
+    directions = np.array([(math.cos(a), math.sin(a)) for a in (i * 2 * math.pi / rays for i in range(rays))])
+
+    open_cells = np.flatnonzero(~walls)
+    seen = np.zeros((len(open_cells), rows * cols), dtype=np.bool_)
+    for first in range(0, len(open_cells), PVS_BATCH):
+        batch = open_cells[first:first + PVS_BATCH]
+        _mark_rays(walls, rows, cols, batch, samples, directions, max_t, seen[first:first + PVS_BATCH])
+
+    pvs = [None] * (rows * cols)
+    for i, cell in enumerate(open_cells.tolist()):
+        pvs[cell] = array('I', np.flatnonzero(seen[i]).tolist())
+    return pvs
+
+def pvs_cells(pvs, maze, x, z):
+    r, c = world_to_cell(x, z)
+    cols = len(maze[0])
+    if not (0 <= r < len(maze) and 0 <= c < cols): return None
+    return pvs[r * cols + c]
+
+def pvs_stats(pvs):
+    open_cells = [v for v in pvs if v is not None]
+    visible_total = sum(len(v) for v in open_cells)
+    mem = sys.getsizeof(pvs) + sum(sys.getsizeof(v) for v in open_cells)
+    return {
+        "cells": len(open_cells),
+        "visible_total": visible_total,
+        "visible_avg": visible_total / len(open_cells) if open_cells else 0,
+        "bytes": mem,
+    }
+
+def eyes_seeing_player(maze, visible, eyes, px, pz, max_dist=15):
+    # Broad phase on the player's PVS, narrow phase with an exact ray.
+    # Line of sight is symmetric, so this is also the set of eyes the
+    # player can see.
+    cols = len(maze[0])
+    watching = []
+    for i, (sx, sz) in enumerate(eyes):
+        r, c = world_to_cell(sx, sz)
+        if visible is not None and r * cols + c not in visible: continue
+        if (px - sx)**2 + (pz - sz)**2 > max_dist * max_dist: continue
+        if has_line_of_sight(maze, px, pz, sx, sz):
+            watching.append(i)
+    return watching